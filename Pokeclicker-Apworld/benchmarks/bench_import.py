@@ -0,0 +1,169 @@
+"""Import time benchmark.
+
+Imports the apworld in fresh interpreters with the Archipelago stand-ins from ./stubs, one module at a time in the order
+the package imports them, and reports the time and peak memory each module adds, then the same for the data validation
+run when generating. The time is the median of --repeat runs, the memory is measured in a separate run with tracemalloc
+(which slows imports down too much to time them at the same time).
+Exits with an error if the total time or memory goes over --budget-ms or --budget-mb.
+
+    python benchmarks/bench_import.py --repeat 5 --json import.json
+    python benchmarks/bench_import.py --budget-ms 300 --compare import.json
+    python -m pytest benchmarks
+"""
+import argparse
+import importlib
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+STUBS_DIR = os.path.join(BENCHMARKS_DIR, "stubs")
+APWORLD_DIR = os.path.join(os.path.dirname(BENCHMARKS_DIR), "pokeclicker")
+
+# every module pulls in what it imports that isn't loaded yet, so each one is charged for the modules only it needs
+MODULES = ["Data", "Items", "Locations", "Regions", "Options", "Meta", "Rules", "__init__"]
+# runGenerationDataValidation, which stage_assert_generate runs before every generation
+VALIDATION = "validation"
+STEPS = MODULES + [VALIDATION]
+
+# the stand-ins are imported before measuring, Archipelago has them loaded long before any apworld
+STUB_MODULES = ["BaseClasses", "Options", "Utils", "worlds.AutoWorld", "worlds.generic.Rules", "worlds.LauncherComponents"]
+
+
+def import_modules(measure_memory: bool) -> dict:
+    """Imports the apworld module by module in this interpreter and validates its data,
+    returns the seconds or peak bytes of each step."""
+    sys.path.insert(0, STUBS_DIR)
+    for stub in STUB_MODULES:
+        importlib.import_module(stub)
+
+    # the package is created without running its __init__.py, so its modules can be imported one by one first
+    spec = importlib.util.spec_from_file_location("pokeclicker", os.path.join(APWORLD_DIR, "__init__.py"),
+                                                  submodule_search_locations=[APWORLD_DIR])
+    package = importlib.util.module_from_spec(spec)
+    sys.modules["pokeclicker"] = package
+
+    results = {}
+    if measure_memory:
+        tracemalloc.start()
+
+    for name in STEPS:
+        if measure_memory:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+
+        if name == VALIDATION:
+            package.DataValidation.runGenerationDataValidation(package.Pokeclicker)
+        elif name == "__init__":
+            spec.loader.exec_module(package)
+        else:
+            importlib.import_module(f"pokeclicker.{name}")
+
+        elapsed = time.perf_counter() - start
+        if measure_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            results[name] = peak - before
+        else:
+            results[name] = elapsed
+
+    return results
+
+
+def run_child(measure_memory: bool) -> dict:
+    command = [sys.executable, os.path.abspath(__file__), "--child"] + (["--memory"] if measure_memory else [])
+    # the validation would be skipped after the first run otherwise, since the data doesn't change between runs
+    environment = dict(os.environ, POKECLICKER_FULL_VALIDATION="1")
+    output = subprocess.run(command, check=True, capture_output=True, text=True, env=environment).stdout
+    # the apworld can print while being imported, the results are the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_benchmark(repeat: int = 5) -> dict:
+    runs = [run_child(False) for _ in range(repeat)]
+    memory = run_child(True)
+
+    seconds = {name: statistics.median(run[name] for run in runs) for name in STEPS}
+    return {
+        "python": ".".join(map(str, sys.version_info[:3])),
+        "repeat": repeat,
+        "total_seconds": statistics.median(sum(run.values()) for run in runs),
+        "seconds": seconds,
+        "peak_bytes": memory,
+        "total_peak_bytes": sum(memory.values()),
+    }
+
+
+def print_results(results: dict, previous: dict = None):
+    print(f"import and data validation of the apworld, median of {results['repeat']} fresh interpreter(s), python {results['python']}")
+    print(f"  {'step':<10} {'time':>10} {'peak memory':>14}" + (f" {'previous time':>15}" if previous else ""))
+    for name in STEPS:
+        line = f"  {name:<10} {results['seconds'][name] * 1000:>7.1f} ms {results['peak_bytes'][name] / 2**20:>11.2f} MB"
+        if previous and name in previous.get("seconds", {}):
+            line += f" {previous['seconds'][name] * 1000:>12.1f} ms"
+        print(line)
+
+    line = f"  {'total':<10} {results['total_seconds'] * 1000:>7.1f} ms {results['total_peak_bytes'] / 2**20:>11.2f} MB"
+    if previous:
+        line += f" {previous['total_seconds'] * 1000:>12.1f} ms"
+    print(line)
+
+
+def check_budget(results: dict, budget_ms: float = None, budget_mb: float = None) -> list[str]:
+    """Returns what went over budget, if anything."""
+    errors = []
+    if budget_ms is not None and results["total_seconds"] * 1000 > budget_ms:
+        errors.append(f"the import and validation took {results['total_seconds'] * 1000:.1f} ms, over the budget of {budget_ms} ms")
+    if budget_mb is not None and results["total_peak_bytes"] / 2**20 > budget_mb:
+        errors.append(f"the import and validation used {results['total_peak_bytes'] / 2**20:.2f} MB, over the budget of {budget_mb} MB")
+    return errors
+
+
+def test_import_benchmark():
+    results = run_benchmark(repeat=1)
+    assert set(results["seconds"]) == set(STEPS)
+    # generous enough for a slow CI machine, it only catches something going very wrong
+    assert not check_budget(results, budget_ms=5000, budget_mb=200)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="how many fresh interpreters to time the import in")
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if the import and validation take longer than this")
+    parser.add_argument("--budget-mb", type=float, default=None, help="fail if the import and validation allocate more than this at their peak")
+    parser.add_argument("--compare", help="show the times of a previous --json results file next to these")
+    parser.add_argument("--json", help="also write the results to this json file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--memory", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(import_modules(args.memory)))
+        return
+
+    results = run_benchmark(args.repeat)
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as file:
+            previous = json.load(file)
+    print_results(results, previous)
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=4)
+
+    errors = check_budget(results, args.budget_ms, args.budget_mb)
+    if errors:
+        for error in errors:
+            print(f"over budget: {error}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
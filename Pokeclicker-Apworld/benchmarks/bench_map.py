@@ -0,0 +1,113 @@
+"""Map checks.
+
+Explores data/map.json with MapGraph on fixed item sets and checks the nodes reached and entered are the ones the chains of
+functions of hooks/Rules.py used to give, including a dungeon at every dungeon_logic value.
+Also checks the memoized map reach is only dropped when one of the items it depends on is collected or removed.
+
+    python -m pytest benchmarks
+"""
+import pytest
+
+import common
+
+START_NODES = {"Kanto Route 1", "Kanto Route 2", "Kanto Route 22", "Viridian City", "Professor Ivy's Lab"}
+
+# the attack needed to complete Viridian Forest (102 minion attack) for each dungeon_logic value
+VIRIDIAN_FOREST_ATTACK = {0: 510, 1: 1122, 2: 1836}
+
+
+@pytest.fixture(scope="module")
+def package():
+    return common.load_apworld()
+
+
+@pytest.fixture(scope="module")
+def multiworld(package):
+    return common.generate(package)
+
+
+def explore(package, multiworld, items: tuple[str, ...], attack: float, scripts: tuple[str, ...] = (), dungeon_logic: int = 0):
+    state = common.new_state(multiworld)
+    for item in items:
+        state.collect(common.create_item(package, item), True)
+    rules = package.hooks.Rules
+    return rules.kanto_map.explore(state, 1, attack, lambda script: script in scripts,
+                                   lambda dungeon: rules.get_dungeon_attack(dungeon_logic, rules.DUNGEON_MINION_ATTACK[dungeon], 0, True))
+
+
+@pytest.mark.parametrize("items, attack, reached, entered", [
+    ((), 0, START_NODES, START_NODES),
+    (("Town Map",), 0, START_NODES | {"Pallet Town"}, START_NODES | {"Pallet Town"}),
+    (("Dungeon Ticket",), 0, START_NODES, START_NODES | {"Viridian Forest"}),
+    (("Dungeon Ticket",), 10000, START_NODES | {"Viridian Forest", "Pewter City"}, START_NODES | {"Viridian Forest", "Pewter City"}),
+    (("Dungeon Ticket", "Boulder Badge"), 1000,
+     START_NODES | {"Viridian Forest", "Pewter City", "Kanto Route 3", "Kanto Route 4 Pokemon Center"},
+     START_NODES | {"Viridian Forest", "Pewter City", "Kanto Route 3", "Kanto Route 4 Pokemon Center", "Mt. Moon"}),
+    (("Dungeon Ticket", "Boulder Badge"), 10000,
+     START_NODES | {"Viridian Forest", "Pewter City", "Kanto Route 3", "Kanto Route 4 Pokemon Center", "Mt. Moon", "Kanto Route 4", "Cerulean City"},
+     START_NODES | {"Viridian Forest", "Pewter City", "Kanto Route 3", "Kanto Route 4 Pokemon Center", "Mt. Moon", "Kanto Route 4", "Cerulean City"}),
+])
+def test_map_reach(package, multiworld, items, attack, reached, entered):
+    reach = explore(package, multiworld, items, attack)
+    assert reach.reached == reached
+    assert reach.entered == entered
+
+
+def test_map_attack_gate(package, multiworld):
+    # Kanto Route 24 needs 14041 expected attack besides Kanto Route 4
+    assert "Kanto Route 24" not in explore(package, multiworld, ("Dungeon Ticket", "Boulder Badge"), 14040).reached
+    assert "Kanto Route 24" in explore(package, multiworld, ("Dungeon Ticket", "Boulder Badge"), 14041).reached
+
+
+def test_map_or_gate(package, multiworld):
+    # Saffron City is reached from Celadon City or with the Rainbow Badge
+    assert "Saffron City" not in explore(package, multiworld, (), 0).reached
+    assert "Saffron City" in explore(package, multiworld, ("Rainbow Badge",), 0).reached
+
+
+def test_map_script_gate(package, multiworld):
+    # New Island needs the Infinite Seasonal Events script besides the Dungeon Ticket
+    assert "New Island" not in explore(package, multiworld, ("Dungeon Ticket",), 0).entered
+    assert "New Island" in explore(package, multiworld, ("Dungeon Ticket",), 0, scripts=("Infinite Seasonal Events",)).entered
+
+
+@pytest.mark.parametrize("dungeon_logic", sorted(VIRIDIAN_FOREST_ATTACK))
+def test_map_dungeon_logic(package, dungeon_logic):
+    multiworld = common.generate(package, {"dungeon_logic": dungeon_logic})
+    world = multiworld.worlds[1]
+    attack = VIRIDIAN_FOREST_ATTACK[dungeon_logic]
+    assert package.hooks.Rules.get_dungeon_attack_needed(world, "Viridian Forest") == attack
+
+    reach = explore(package, multiworld, ("Dungeon Ticket",), attack, dungeon_logic=dungeon_logic)
+    assert {"Viridian Forest", "Pewter City"} <= reach.reached
+
+    reach = explore(package, multiworld, ("Dungeon Ticket",), attack - 1, dungeon_logic=dungeon_logic)
+    assert "Viridian Forest" in reach.entered
+    assert "Viridian Forest" not in reach.reached
+    assert "Pewter City" not in reach.entered
+
+
+def test_map_memo_invalidation(package, multiworld):
+    rules = package.hooks.Rules
+    helpers = package.Helpers
+    world = multiworld.worlds[1]
+    group = rules.get_map_reach.dependency_group
+    assert group != helpers.UNKNOWN_DEPENDENCIES_GROUP
+
+    state = common.new_state(multiworld)
+    assert not rules.entered_map_node(world, state, 1, "Viridian Forest")
+    assert helpers.get_state_memo(state, 1, group)
+
+    # the map doesn't depend on the Mystery Egg, so its memo is kept
+    state.collect(common.create_item(package, "Mystery Egg"), True)
+    assert helpers.get_state_memo(state, 1, group)
+
+    state.collect(common.create_item(package, "Dungeon Ticket"), True)
+    assert not helpers.get_state_memo(state, 1, group)
+    assert rules.entered_map_node(world, state, 1, "Viridian Forest")
+
+    # the copy shares the memo until either state changes, removing from one doesn't change the other
+    copy = state.copy()
+    state.remove(common.create_item(package, "Dungeon Ticket"))
+    assert not rules.entered_map_node(world, state, 1, "Viridian Forest")
+    assert rules.entered_map_node(world, copy, 1, "Viridian Forest")
@@ -0,0 +1,142 @@
+"""Rule evaluation benchmark.
+
+Generates a world with the Archipelago stand-ins from ./stubs, then replays item collection sequences against it.
+After every collected item, the access rule of every location and entrance made by set_rules is evaluated (a sweep).
+Reports the time per sweep, the slowest rules and how many times the functions of hooks/Rules.py got called.
+
+    python benchmarks/bench_rules.py --sequences 5 --record sequences.json
+    python benchmarks/bench_rules.py --replay sequences.json --json results.json
+    python -m pytest benchmarks
+"""
+import argparse
+import functools
+import inspect
+import json
+import time
+from collections import Counter, defaultdict
+
+import common
+
+
+def count_hook_calls(package) -> Counter:
+    """Wrap every function of hooks/Rules.py so their calls get counted, including the calls they make to each other.
+    It has to be done before set_rules, since that's when the requires functions are resolved."""
+    hook_rules = package.hooks.Rules
+    calls = Counter()
+
+    def counted(name, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return func(*args, **kwargs)
+        return wrapper
+
+    for name, func in list(vars(hook_rules).items()):
+        if inspect.isfunction(func) and func.__module__ == hook_rules.__name__:
+            setattr(hook_rules, name, counted(name, func))
+
+    return calls
+
+
+def run_benchmark(sequences: list[list[str]] = None, sequence_count: int = 3, seed: int = 0, step: int = 1,
+                  options: dict = None) -> dict:
+    package = common.load_apworld()
+    hook_calls = count_hook_calls(package)
+    multiworld = common.generate(package, options)
+
+    if sequences is None:
+        sequences = common.record_sequences(multiworld, sequence_count, seed)
+
+    spots = common.rule_spots(multiworld)
+    rule_time = defaultdict(float)
+    sweep_times = []
+    hook_calls.clear()  # only count the calls made while evaluating
+
+    for sequence in sequences:
+        state = common.new_state(multiworld)
+        for index, item_name in enumerate(sequence, 1):
+            state.collect(common.create_item(package, item_name))
+            if index % step and index != len(sequence):
+                continue
+
+            sweep_start = time.perf_counter()
+            for spot in spots:
+                start = time.perf_counter()
+                spot.access_rule(state)
+                rule_time[spot.name] += time.perf_counter() - start
+            sweep_times.append(time.perf_counter() - sweep_start)
+
+    sweeps = len(sweep_times)
+    return {
+        "options": options or {},
+        "sequences": len(sequences),
+        "sweeps": sweeps,
+        "rules": len(spots),
+        "total_seconds": sum(sweep_times),
+        "mean_sweep_seconds": sum(sweep_times) / sweeps if sweeps else 0.0,
+        "max_sweep_seconds": max(sweep_times, default=0.0),
+        "rule_mean_seconds": {name: total / sweeps for name, total in rule_time.items()} if sweeps else {},
+        "hook_calls": sum(hook_calls.values()),
+        "hook_calls_per_sweep": sum(hook_calls.values()) / sweeps if sweeps else 0.0,
+        "hook_calls_by_function": dict(hook_calls.most_common()),
+    }
+
+
+def print_results(results: dict, top: int):
+    print(f"{results['rules']} rules, {results['sweeps']} sweeps over {results['sequences']} sequence(s), options: {results['options']}")
+    print(f"total {results['total_seconds'] * 1000:.1f} ms, "
+          f"mean sweep {results['mean_sweep_seconds'] * 1000:.3f} ms, max sweep {results['max_sweep_seconds'] * 1000:.3f} ms")
+    print(f"hooks/Rules.py calls: {results['hook_calls']} ({results['hook_calls_per_sweep']:.1f} per sweep)")
+
+    slowest = sorted(results["rule_mean_seconds"].items(), key=lambda rule: rule[1], reverse=True)[:top]
+    if slowest:
+        print(f"\nslowest {len(slowest)} rules (mean per sweep):")
+        for name, seconds in slowest:
+            print(f"  {seconds * 1e6:9.2f} us  {name}")
+
+    busiest = list(results["hook_calls_by_function"].items())[:top]
+    if busiest:
+        print(f"\nmost called hooks/Rules.py functions:")
+        for name, calls in busiest:
+            print(f"  {calls:9d}  {name}")
+
+
+def test_rule_benchmark():
+    results = run_benchmark(sequence_count=1, step=25)
+    assert results["sweeps"] > 0
+    assert len(results["rule_mean_seconds"]) == results["rules"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sequences", type=int, default=3, help="how many item collection sequences to generate")
+    parser.add_argument("--seed", type=int, default=0, help="seed used to shuffle the generated sequences")
+    parser.add_argument("--step", type=int, default=1, help="sweep after every N collected items")
+    parser.add_argument("--options", type=json.loads, default=None, help='options to change from their default, as json. eg. \'{"dexsanity": 3}\'')
+    parser.add_argument("--record", help="save the generated sequences to this json file")
+    parser.add_argument("--replay", help="replay the sequences of this json file instead of generating new ones")
+    parser.add_argument("--top", type=int, default=10, help="how many of the slowest rules and most called functions to show")
+    parser.add_argument("--json", help="also write the results to this json file")
+    args = parser.parse_args()
+
+    sequences = None
+    if args.replay:
+        with open(args.replay) as file:
+            sequences = json.load(file)
+
+    if args.record:
+        package = common.load_apworld()
+        sequences = sequences or common.record_sequences(common.generate(package, args.options), args.sequences, args.seed)
+        with open(args.record, "w") as file:
+            json.dump(sequences, file)
+
+    results = run_benchmark(sequences, args.sequences, args.seed, args.step, args.options)
+    print_results(results, args.top)
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Shared setup for the benchmarks: puts the Archipelago stand-ins from ./stubs on the path,
+loads the apworld as the `pokeclicker` package and generates worlds up to set_rules."""
+import dataclasses
+import importlib.util
+import os
+import random
+import sys
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+STUBS_DIR = os.path.join(BENCHMARKS_DIR, "stubs")
+APWORLD_DIR = os.path.join(os.path.dirname(BENCHMARKS_DIR), "pokeclicker")
+
+if STUBS_DIR not in sys.path:
+    sys.path.insert(0, STUBS_DIR)
+
+from BaseClasses import CollectionState, ItemClassification, MultiWorld
+
+
+def load_apworld(package_name: str = "pokeclicker"):
+    """Import the apworld from its folder, the same way Archipelago imports it from worlds/."""
+    if package_name in sys.modules:
+        return sys.modules[package_name]
+
+    spec = importlib.util.spec_from_file_location(package_name, os.path.join(APWORLD_DIR, "__init__.py"),
+                                                  submodule_search_locations=[APWORLD_DIR])
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[package_name] = package
+    spec.loader.exec_module(package)
+    return package
+
+
+def generate(package, options: dict = None, players: int = 1) -> MultiWorld:
+    """Run the world generation steps up to set_rules for every player, using the default options updated with `options`."""
+    multiworld = MultiWorld(players)
+    world_type = package.Pokeclicker
+
+    for player in multiworld.player_ids:
+        world = world_type(multiworld, player)
+        values = {field.name: field.type() for field in dataclasses.fields(world_type.options_dataclass)}
+        for name, value in (options or {}).items():
+            values[name].value = value
+        world.options = world_type.options_dataclass(**values)
+        multiworld.worlds[player] = world
+
+    for step in ("create_regions", "create_items", "set_rules"):
+        for player in multiworld.player_ids:
+            getattr(multiworld.worlds[player], step)()
+
+    return multiworld
+
+
+def progression_item_names(multiworld: MultiWorld, player: int = 1) -> list[str]:
+    """Every progression item of the player, wherever it ended up (pool, placed or precollected)."""
+    names = [item.name for item in multiworld.itempool if item.player == player and item.advancement]
+    names += [location.item.name for location in multiworld.get_locations(player)
+              if location.item is not None and location.item.advancement]
+    names += [item.name for item in multiworld.precollected_items[player] if item.advancement]
+    return names
+
+
+def record_sequences(multiworld: MultiWorld, count: int, seed: int, player: int = 1) -> list[list[str]]:
+    """Shuffled orders in which the player's progression items get collected."""
+    rng = random.Random(seed)
+    names = progression_item_names(multiworld, player)
+    sequences = []
+    for _ in range(count):
+        sequence = names[:]
+        rng.shuffle(sequence)
+        sequences.append(sequence)
+    return sequences
+
+
+def create_item(package, name: str, player: int = 1):
+    return package.Items.ManualItem(name, ItemClassification.progression, None, player=player)
+
+
+def rule_spots(multiworld: MultiWorld, player: int = 1) -> list:
+    """Every location and entrance of the player, which are what set_rules puts access rules on."""
+    spots = []
+    for region in multiworld.regions:
+        if region.player == player:
+            spots.extend(region.locations)
+            spots.extend(region.exits)
+    return spots
+
+
+def new_state(multiworld: MultiWorld) -> CollectionState:
+    return CollectionState(multiworld)
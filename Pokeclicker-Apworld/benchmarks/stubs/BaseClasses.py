@@ -0,0 +1,219 @@
+"""Minimal stand-in for Archipelago's BaseClasses, with only what the apworld and the benchmarks use."""
+from collections import Counter, namedtuple
+from enum import IntFlag
+import random
+
+
+class ItemClassification(IntFlag):
+    filler = 0
+    progression = 1
+    useful = 2
+    trap = 4
+    skip_balancing = 8
+    progression_skip_balancing = 9
+
+
+Tutorial = namedtuple("Tutorial", "tutorial_name description language file_name link authors")
+
+
+class Item:
+    def __init__(self, name, classification, code, player):
+        self.name = name
+        self.classification = classification
+        self.code = code
+        self.player = player
+        self.location = None
+
+    @property
+    def advancement(self):
+        return bool(self.classification & ItemClassification.progression)
+
+    def __repr__(self):
+        return f"Item({self.name})"
+
+
+class Location:
+    game = "Generic"
+
+    def __init__(self, player, name, address=None, parent=None):
+        self.player = player
+        self.name = name
+        self.address = address
+        self.parent_region = parent
+        self.item = None
+        self.locked = False
+
+    @staticmethod
+    def access_rule(state):
+        return True
+
+    def place_locked_item(self, item):
+        self.item = item
+        item.location = self
+        self.locked = True
+
+    def can_reach(self, state):
+        return self.access_rule(state) and self.parent_region.can_reach(state)
+
+
+class Entrance:
+    def __init__(self, player, name, parent=None):
+        self.player = player
+        self.name = name
+        self.parent_region = parent
+        self.connected_region = None
+
+    @staticmethod
+    def access_rule(state):
+        return True
+
+    def connect(self, region):
+        self.connected_region = region
+        region.entrances.append(self)
+
+    def can_reach(self, state):
+        return self.access_rule(state) and self.parent_region.can_reach(state)
+
+
+class Region:
+    def __init__(self, name, player, multiworld):
+        self.name = name
+        self.player = player
+        self.multiworld = multiworld
+        self.locations = []
+        self.exits = []
+        self.entrances = []
+
+    def can_reach(self, state):
+        return self in state.reachable_regions(self.player)
+
+
+class MultiWorld:
+    def __init__(self, players=1, seed=0):
+        self.player_ids = tuple(range(1, players + 1))
+        self.players = players
+        self.regions = []
+        self.itempool = []
+        self.precollected_items = {p: [] for p in self.player_ids}
+        self.early_items = {p: {} for p in self.player_ids}
+        self.local_early_items = {p: {} for p in self.player_ids}
+        self.worlds = {}
+        self.completion_condition = {}
+        self.random = random.Random(seed)
+
+    def get_all_ids(self):
+        return self.player_ids
+
+    def get_player_name(self, player):
+        return f"Player{player}"
+
+    def _all(self, attr):
+        for region in self.regions:
+            yield from getattr(region, attr)
+
+    def get_region(self, name, player):
+        for region in self.regions:
+            if region.name == name and region.player == player:
+                return region
+        raise KeyError(name)
+
+    def get_entrance(self, name, player):
+        for region in self.regions:
+            for exit_ in region.exits:
+                if exit_.name == name and exit_.player == player:
+                    return exit_
+        raise KeyError(name)
+
+    def get_location(self, name, player):
+        for region in self.regions:
+            for location in region.locations:
+                if location.name == name and location.player == player:
+                    return location
+        raise KeyError(name)
+
+    def get_locations(self, player=None):
+        return [l for l in self._all("locations") if player is None or l.player == player]
+
+    def get_unfilled_locations(self, player=None):
+        return [l for l in self.get_locations(player) if l.item is None]
+
+    def get_items(self):
+        return [l.item for l in self.get_locations() if l.item] + list(self.itempool)
+
+    def push_precollected(self, item):
+        self.precollected_items[item.player].append(item)
+
+
+class CollectionState:
+    additional_init_functions = []
+    additional_copy_functions = []
+
+    def __init__(self, parent, skip_precollected=False):
+        self.multiworld = parent
+        self.prog_items = {p: Counter() for p in parent.get_all_ids()}
+        self._reachable = {}
+        for function in self.additional_init_functions:
+            function(self, parent)
+        if not skip_precollected:
+            for items in parent.precollected_items.values():
+                for item in items:
+                    self.collect(item, True)
+
+    def count(self, item, player):
+        return self.prog_items[player][item]
+
+    def has(self, item, player, count=1):
+        return self.prog_items[player][item] >= count
+
+    def has_all(self, items, player):
+        return all(self.prog_items[player][i] for i in items)
+
+    def count_group(self, group, player):
+        player_prog_items = self.prog_items[player]
+        return sum(player_prog_items[name] for name in self.multiworld.worlds[player].item_name_groups[group])
+
+    def collect(self, item, prevent_sweep=False, location=None):
+        changed = self.multiworld.worlds[item.player].collect(self, item)
+        self._reachable.pop(item.player, None)
+        return changed
+
+    def remove(self, item):
+        changed = self.multiworld.worlds[item.player].remove(self, item)
+        self._reachable.pop(item.player, None)
+        return changed
+
+    def copy(self):
+        ret = CollectionState(self.multiworld, True)
+        ret.prog_items = {p: c.copy() for p, c in self.prog_items.items()}
+        for function in self.additional_copy_functions:
+            ret = function(self, ret)
+        return ret
+
+    def reachable_regions(self, player):
+        if player not in self._reachable:
+            reached = set()
+            menu = self.multiworld.get_region("Menu", player)
+            queue = [menu]
+            reached.add(menu)
+            while queue:
+                region = queue.pop()
+                for exit_ in region.exits:
+                    target = exit_.connected_region
+                    if target is not None and target not in reached and exit_.access_rule(self):
+                        reached.add(target)
+                        queue.append(target)
+            self._reachable[player] = reached
+        return self._reachable[player]
+
+    def can_reach(self, spot, resolution_hint=None, player=None):
+        if isinstance(spot, str):
+            if resolution_hint == "Location":
+                spot = self.multiworld.get_location(spot, player)
+            elif resolution_hint == "Entrance":
+                spot = self.multiworld.get_entrance(spot, player)
+            else:
+                spot = self.multiworld.get_region(spot, player)
+        return spot.can_reach(self)
+
+    def can_reach_location(self, name, player):
+        return self.can_reach(name, "Location", player)
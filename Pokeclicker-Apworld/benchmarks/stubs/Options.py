@@ -0,0 +1,145 @@
+"""Minimal stand-in for Archipelago's Options, with only what the apworld and the benchmarks use."""
+from dataclasses import dataclass
+from enum import IntFlag
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class Visibility(IntFlag):
+    none = 0
+    template = 1
+    simple_ui = 2
+    complex_ui = 4
+    spoiler = 8
+    all = 15
+
+
+class Option(Generic[T]):
+    default = 0
+    visibility = Visibility.all
+    rich_text_doc = None
+
+    def __init__(self, value=None):
+        self.value = self.default if value is None else value
+
+    @classmethod
+    def from_text(cls, text):
+        return cls(int(text))
+
+
+class NumericOption(Option):
+    pass
+
+
+class Toggle(NumericOption):
+    default = 0
+
+    @classmethod
+    def from_text(cls, text):
+        return cls(1 if text.lower() in ("true", "on", "1") else 0)
+
+
+class DefaultOnToggle(Toggle):
+    default = 1
+
+
+class Choice(NumericOption):
+    options = {}
+    aliases = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.options = {k[len("option_"):]: v for k, v in vars(cls).items() if k.startswith("option_")}
+        cls.aliases = {k[len("alias_"):]: v for k, v in vars(cls).items() if k.startswith("alias_")}
+
+    @classmethod
+    def from_text(cls, text):
+        text = text.lower()
+        if text in cls.options:
+            return cls(cls.options[text])
+        return cls(cls.aliases[text])
+
+    @property
+    def current_key(self):
+        return {value: key for key, value in self.options.items()}.get(self.value, str(self.value))
+
+
+class TextChoice(Choice):
+    pass
+
+
+class Range(NumericOption):
+    range_start = 0
+    range_end = 1
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "default" not in vars(cls):
+            cls.default = cls.range_start
+
+
+class NamedRange(Range):
+    special_range_names = {}
+
+    @classmethod
+    def from_text(cls, text):
+        if text.lower() in cls.special_range_names:
+            return cls(cls.special_range_names[text.lower()])
+        return cls(int(text))
+
+
+class FreeText(Option):
+    default = ""
+
+
+class OptionSet(Option):
+    def __init__(self, value=None):
+        self.value = set() if value is None else value
+
+
+class OptionList(Option):
+    def __init__(self, value=None):
+        self.value = [] if value is None else value
+
+
+class LocalItems(OptionSet):
+    pass
+
+
+class StartLocationHints(OptionSet):
+    pass
+
+
+class StartInventoryPool(Option):
+    def __init__(self, value=None):
+        self.value = {} if value is None else value
+
+
+class DeathLink(Toggle):
+    pass
+
+
+class OptionGroup:
+    def __init__(self, name, options, start_collapsed=False):
+        self.name = name
+        self.options = options
+        self.start_collapsed = start_collapsed
+
+
+item_and_loc_options = [LocalItems, StartLocationHints]
+
+
+class OptionsMetaProperty(type):
+    @property
+    def type_hints(cls):
+        hints = {}
+        for klass in reversed(cls.__mro__):
+            hints.update(getattr(klass, "__annotations__", {}))
+        return hints
+
+
+@dataclass
+class PerGameCommonOptions(metaclass=OptionsMetaProperty):
+    local_items: LocalItems
+    start_location_hints: StartLocationHints
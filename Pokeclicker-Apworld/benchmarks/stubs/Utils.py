@@ -0,0 +1,21 @@
+"""Minimal stand-in for Archipelago's Utils, with only what the apworld and the benchmarks use."""
+import atexit
+import os
+import shutil
+import tempfile
+
+# every run gets its own cache folder, removed when it exits, so a run never reuses what an earlier one cached
+_cache_dir = tempfile.mkdtemp(prefix="apstub_cache_")
+atexit.register(shutil.rmtree, _cache_dir, ignore_errors=True)
+
+
+def deprecate(message):
+    raise Exception(message)
+
+
+def cache_path(*path):
+    return os.path.join(_cache_dir, *path)
+
+
+def visualize_regions(*args, **kwargs):
+    pass
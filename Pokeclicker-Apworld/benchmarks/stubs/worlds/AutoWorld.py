@@ -0,0 +1,70 @@
+"""Minimal stand-in for Archipelago's worlds.AutoWorld, with only what the apworld and the benchmarks use."""
+import random
+
+from BaseClasses import CollectionState
+
+
+class AutoLogicRegister(type):
+    def __new__(mcs, name, bases, dct):
+        new_class = super().__new__(mcs, name, bases, dct)
+        for item_name, function in dct.items():
+            if item_name == "copy_mixin":
+                CollectionState.additional_copy_functions.append(function)
+            elif item_name == "init_mixin":
+                CollectionState.additional_init_functions.append(function)
+            elif not item_name.startswith("__"):
+                if hasattr(CollectionState, item_name):
+                    raise Exception(f"Name conflict on Logic Mixin {name} trying to overwrite {item_name}")
+                setattr(CollectionState, item_name, function)
+        return new_class
+
+
+class LogicMixin(metaclass=AutoLogicRegister):
+    pass
+
+
+class WebWorld:
+    theme = "grass"
+    game_info_languages = ["en"]
+    options_presets = {}
+    options_page = True
+    bug_report_page = None
+    tutorials = []
+    option_groups = []
+
+
+class World:
+    game = "Generic"
+
+    def __init__(self, multiworld, player):
+        self.multiworld = multiworld
+        self.player = player
+        self.random = random.Random(player)
+
+    def collect_item(self, state, item, remove=False):
+        return item.name if item.advancement else None
+
+    def collect(self, state, item):
+        name = self.collect_item(state, item)
+        if name:
+            state.prog_items[self.player][name] += 1
+            return True
+        return False
+
+    def remove(self, state, item):
+        name = self.collect_item(state, item, True)
+        if name:
+            state.prog_items[self.player][name] -= 1
+            if state.prog_items[self.player][name] < 1:
+                del state.prog_items[self.player][name]
+            return True
+        return False
+
+    def get_entrance(self, name):
+        return self.multiworld.get_entrance(name, self.player)
+
+    def get_location(self, name):
+        return self.multiworld.get_location(name, self.player)
+
+    def get_region(self, name):
+        return self.multiworld.get_region(name, self.player)
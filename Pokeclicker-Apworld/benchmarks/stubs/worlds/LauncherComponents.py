@@ -0,0 +1,25 @@
+"""Minimal stand-in for Archipelago's worlds.LauncherComponents, with only what the apworld and the benchmarks use."""
+from enum import Enum, auto
+
+components = []
+icon_paths = {}
+
+
+class Type(Enum):
+    TOOL = auto()
+    CLIENT = auto()
+
+
+class Component:
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+
+class SuffixIdentifier:
+    def __init__(self, *suffixes):
+        self.suffixes = suffixes
+
+
+def launch_subprocess(*args, **kwargs):
+    pass
@@ -0,0 +1,20 @@
+"""Minimal stand-in for Archipelago's worlds.generic.Rules, with only what the apworld and the benchmarks use."""
+from BaseClasses import Location, Entrance
+
+
+def set_rule(spot, rule):
+    spot.access_rule = rule
+
+
+def add_rule(spot, rule, combine="and"):
+    old_rule = spot.access_rule
+    if old_rule is Location.access_rule or old_rule is Entrance.access_rule:
+        spot.access_rule = rule if combine == "and" else old_rule
+    elif combine == "and":
+        spot.access_rule = lambda state: rule(state) and old_rule(state)
+    else:
+        spot.access_rule = lambda state: rule(state) or old_rule(state)
+
+
+def forbid_items_for_player(location, items, player):
+    pass
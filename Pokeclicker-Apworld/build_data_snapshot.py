@@ -0,0 +1,25 @@
+"""Writes pokeclicker/data/tables.snapshot, the tables of Data.py once the hooks of hooks/Data.py ran on the json files.
+
+Data.py loads the snapshot instead of parsing the json files when it is up to date, so run this again before building
+the .apworld whenever data/*.json or hooks/Data.py change (an out of date snapshot is ignored, not used).
+The snapshot is only read by the Python version that wrote it.
+
+    python build_data_snapshot.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+# the apworld is imported with the Archipelago stand-ins of the benchmarks, the tables don't depend on Archipelago itself
+import common
+
+
+def main():
+    package = common.load_apworld()
+    path = package.Data.write_data_snapshot()
+    print(f"Wrote {path} ({os.path.getsize(path)} bytes, data hash {package.Data.get_data_hash()[:12]})")
+
+
+if __name__ == "__main__":
+    main()
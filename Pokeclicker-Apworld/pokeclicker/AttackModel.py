@@ -0,0 +1,98 @@
+from typing import Iterable, Sequence
+
+try:
+    import numpy
+except ImportError: # numpy isn't one of Archipelago's requirements, the batch functions fall back to plain Python without it
+    numpy = None
+
+######################
+# Attack model
+#
+# The expected attack of the player only depends on a few counts: badges, pokemon, auto clickers and two held items.
+# The formulas are kept here as plain functions of those counts, so the rules in hooks/Rules.py use them for a single state,
+# and tools (spoiler analysis, balancing) can use the batch versions to evaluate many hypothetical states at once.
+#
+# The batch functions take sequences (or numpy arrays) of the same length and return a numpy array when numpy is installed,
+# or a list otherwise. Both give the same values as the single state functions, up to floating point rounding.
+######################
+
+# the expected attack is the attack of the party plus the clicks, over 25 seconds
+ATTACK_SECONDS = 25
+
+
+def party_attack(num_pokemon: int, num_badges: int) -> float:
+    """Returns the attack value of the player's expected party."""
+    avgBaseAttack = 70 + 4.2 * num_badges
+    avgLevel = min(100, 20 + 10 * num_badges)
+    return num_pokemon * avgBaseAttack * (avgLevel / 100)
+
+def click_attack(num_pokemon: int, has_shiny_code: bool, has_rocky_helmet: bool) -> float:
+    """Returns the attack value of a single click."""
+    if has_shiny_code:
+        num_pokemon += 1
+    attack = (1 + num_pokemon) ** 1.4
+    if has_rocky_helmet:
+        attack *= 1.4
+    return attack
+
+def clicks_per_second(base_clicks_per_second: int, auto_clicker_count: int, progressive_auto_clicker_count: int) -> int:
+    """Returns how many clicks per second the player is expected to do, the auto clickers replace the yaml's clicks per second when faster."""
+    if progressive_auto_clicker_count > 0:
+        auto_clicker_count = 0
+    return max(base_clicks_per_second, auto_clicker_count * 100, progressive_auto_clicker_count * 20)
+
+def expected_attack(num_pokemon: int, num_badges: int, clicks: int, has_shiny_code: bool, has_rocky_helmet: bool) -> float:
+    """Returns the attack value of the player's expected party and clicks."""
+    attack_from_clicks = click_attack(num_pokemon, has_shiny_code, has_rocky_helmet) * clicks
+    return (party_attack(num_pokemon, num_badges) + attack_from_clicks) * ATTACK_SECONDS
+
+
+def party_attacks(num_pokemon: Sequence[int], num_badges: Sequence[int]):
+    """Returns the party attack of every (pokemon, badges) pair."""
+    if numpy is None:
+        return [party_attack(pokemon, badges) for pokemon, badges in zip(num_pokemon, num_badges)]
+
+    num_badges = numpy.asarray(num_badges, dtype=numpy.float64)
+    avgBaseAttack = 70 + 4.2 * num_badges
+    avgLevel = numpy.minimum(100, 20 + 10 * num_badges)
+    return numpy.asarray(num_pokemon, dtype=numpy.float64) * avgBaseAttack * (avgLevel / 100)
+
+def click_attacks(num_pokemon: Sequence[int], has_shiny_code: Sequence[bool], has_rocky_helmet: Sequence[bool]):
+    """Returns the attack of a single click for every (pokemon, shiny code, rocky helmet) triple."""
+    if numpy is None:
+        return [click_attack(pokemon, shiny, helmet) for pokemon, shiny, helmet in zip(num_pokemon, has_shiny_code, has_rocky_helmet)]
+
+    num_pokemon = numpy.asarray(num_pokemon, dtype=numpy.float64) + (numpy.asarray(has_shiny_code) > 0)
+    attack = (1 + num_pokemon) ** 1.4
+    return numpy.where(numpy.asarray(has_rocky_helmet) > 0, attack * 1.4, attack)
+
+def clicks_per_seconds(base_clicks_per_second: int, auto_clicker_count: Sequence[int], progressive_auto_clicker_count: Sequence[int]):
+    """Returns the expected clicks per second for every (auto clickers, progressive auto clickers) pair."""
+    if numpy is None:
+        return [clicks_per_second(base_clicks_per_second, auto, progressive) for auto, progressive in zip(auto_clicker_count, progressive_auto_clicker_count)]
+
+    progressive_auto_clicker_count = numpy.asarray(progressive_auto_clicker_count, dtype=numpy.int64)
+    auto_clicker_count = numpy.where(progressive_auto_clicker_count > 0, 0, numpy.asarray(auto_clicker_count, dtype=numpy.int64))
+    return numpy.maximum(numpy.maximum(base_clicks_per_second, auto_clicker_count * 100), progressive_auto_clicker_count * 20)
+
+def expected_attacks(num_pokemon: Sequence[int], num_badges: Sequence[int], clicks: Sequence[int],
+                     has_shiny_code: Sequence[bool], has_rocky_helmet: Sequence[bool]):
+    """Returns the expected attack of every state described by the counts at the same index."""
+    if numpy is None:
+        return [expected_attack(*counts) for counts in zip(num_pokemon, num_badges, clicks, has_shiny_code, has_rocky_helmet)]
+
+    attack_from_clicks = click_attacks(num_pokemon, has_shiny_code, has_rocky_helmet) * numpy.asarray(clicks, dtype=numpy.float64)
+    return (party_attacks(num_pokemon, num_badges) + attack_from_clicks) * ATTACK_SECONDS
+
+
+def expected_attacks_for_counts(base_clicks_per_second: int, counts: Iterable[dict]):
+    """Returns the expected attack of many states at once, each given as a dict with the keys
+    "pokemon", "badges", "auto_clickers", "progressive_auto_clickers", "shiny_code" and "rocky_helmet" (missing keys count as 0)."""
+    keys = ("pokemon", "badges", "auto_clickers", "progressive_auto_clickers", "shiny_code", "rocky_helmet")
+    columns = {key: [] for key in keys}
+    for state_counts in counts:
+        for key in keys:
+            columns[key].append(state_counts.get(key, 0))
+
+    clicks = clicks_per_seconds(base_clicks_per_second, columns["auto_clickers"], columns["progressive_auto_clickers"])
+    return expected_attacks(columns["pokemon"], columns["badges"], clicks, columns["shiny_code"], columns["rocky_helmet"])
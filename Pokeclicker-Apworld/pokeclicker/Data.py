@@ -1,4 +1,9 @@
+import hashlib
 import logging
+import marshal
+import os
+import pkgutil
+import sys
 
 from .DataValidation import DataValidation, ValidationError
 from .Helpers import load_data_file as helpers_load_data_file
@@ -7,7 +12,8 @@ from .hooks.Data import \
     after_load_game_file, \
     after_load_item_file, after_load_location_file, \
     after_load_region_file, after_load_category_file, \
-    after_load_option_file, after_load_meta_file
+    after_load_option_file, after_load_meta_file, \
+    after_load_map_file
 
 # blatantly copied from the minecraft ap world because why not
 def load_data_file(*args) -> dict:
@@ -36,26 +42,100 @@ class ManualFile:
         return contents
 
 
-game_table = ManualFile('game.json', dict).load() #dict
-item_table = convert_to_list(ManualFile('items.json', list).load(), 'data') #list
-location_table = convert_to_list(ManualFile('locations.json', list).load(), 'data') #list
-region_table = ManualFile('regions.json', dict).load() #dict
-category_table = ManualFile('categories.json', dict).load() #dict
-option_table = ManualFile('options.json', dict).load() #dict
-meta_table = ManualFile('meta.json', dict).load() #dict
-
-# Removal of schemas in root of tables
-region_table.pop('$schema', '')
-category_table.pop('$schema', '')
-
-# hooks
-game_table = after_load_game_file(game_table)
-item_table = after_load_item_file(item_table)
-location_table = after_load_location_file(location_table)
-region_table = after_load_region_file(region_table)
-category_table = after_load_category_file(category_table)
-option_table = after_load_option_file(option_table)
-meta_table = after_load_meta_file(meta_table)
+######################
+# Data snapshot
+#
+# The tables below are what the json files of data/ become once the hooks of hooks/Data.py ran on them.
+# `python build_data_snapshot.py` (next to the pokeclicker folder) writes them to data/tables.snapshot with marshal,
+# which is much faster to load than parsing the json again.
+# The snapshot is only used if it was written from the same json files and hooks/Data.py (and by the same Python version),
+# otherwise the json files are loaded like before.
+######################
+
+DATA_FILES = ['game.json', 'items.json', 'locations.json', 'regions.json', 'categories.json', 'options.json', 'meta.json', 'map.json']
+SNAPSHOT_FILE = 'tables.snapshot'
+SNAPSHOT_VERSION = 1
+
+def get_data_hash() -> str:
+    """Returns the hash of everything the tables are made from: the json files of data/ and hooks/Data.py."""
+    data_hash = hashlib.sha256()
+    for path in [f"data/{filename}" for filename in DATA_FILES] + ["hooks/Data.py"]:
+        try:
+            contents = pkgutil.get_data(__name__, path)
+        except OSError:
+            contents = b""
+        data_hash.update(path.encode())
+        data_hash.update(len(contents).to_bytes(8, "little"))
+        data_hash.update(contents)
+    return data_hash.hexdigest()
+
+def load_tables_from_json() -> dict:
+    tables = {
+        "game": ManualFile('game.json', dict).load(), #dict
+        "item": convert_to_list(ManualFile('items.json', list).load(), 'data'), #list
+        "location": convert_to_list(ManualFile('locations.json', list).load(), 'data'), #list
+        "region": ManualFile('regions.json', dict).load(), #dict
+        "category": ManualFile('categories.json', dict).load(), #dict
+        "option": ManualFile('options.json', dict).load(), #dict
+        "meta": ManualFile('meta.json', dict).load(), #dict
+        "map": ManualFile('map.json', dict).load(), #dict
+    }
+
+    # Removal of schemas in root of tables
+    tables["region"].pop('$schema', '')
+    tables["category"].pop('$schema', '')
+
+    # hooks
+    tables["game"] = after_load_game_file(tables["game"])
+    tables["item"] = after_load_item_file(tables["item"])
+    tables["location"] = after_load_location_file(tables["location"])
+    tables["region"] = after_load_region_file(tables["region"])
+    tables["category"] = after_load_category_file(tables["category"])
+    tables["option"] = after_load_option_file(tables["option"])
+    tables["meta"] = after_load_meta_file(tables["meta"])
+    tables["map"] = after_load_map_file(tables["map"])
+
+    return tables
+
+def load_tables_from_snapshot(data_hash: str) -> dict|None:
+    """Returns the tables of data/tables.snapshot, or None if there's no snapshot or it's out of date."""
+    try:
+        contents = pkgutil.get_data(__name__, f"data/{SNAPSHOT_FILE}")
+    except OSError:
+        return None
+
+    try:
+        version, python_version, snapshot_hash, tables = marshal.loads(contents)
+    except (EOFError, ValueError, TypeError):
+        logging.warning(f"Manual: data/{SNAPSHOT_FILE} cannot be read, the json files are loaded instead.")
+        return None
+
+    if version != SNAPSHOT_VERSION or python_version != tuple(sys.version_info[:2]) or snapshot_hash != data_hash:
+        logging.debug(f"Manual: data/{SNAPSHOT_FILE} is out of date, the json files are loaded instead.")
+        return None
+
+    return tables
+
+def write_data_snapshot() -> str:
+    """Writes the tables loaded from the json files to data/tables.snapshot, and returns its path.
+    Only works when the apworld is a folder, not a .apworld file."""
+    path = os.path.join(os.path.dirname(__file__), "data", SNAPSHOT_FILE)
+    contents = marshal.dumps((SNAPSHOT_VERSION, tuple(sys.version_info[:2]), get_data_hash(), load_tables_from_json()))
+    with open(path, "wb") as snapshot:
+        snapshot.write(contents)
+    return path
+
+
+tables = load_tables_from_snapshot(get_data_hash()) or load_tables_from_json()
+
+game_table = tables["game"] #dict
+item_table = tables["item"] #list
+location_table = tables["location"] #list
+region_table = tables["region"] #dict
+category_table = tables["category"] #dict
+option_table = tables["option"] #dict
+meta_table = tables["meta"] #dict
+map_table = tables["map"] #dict
 
 # seed all of the tables for validation
 DataValidation.game_table = game_table
@@ -1,183 +1,140 @@
+import hashlib
 import logging
+import os
+import pkgutil
 import re
+import sys
 import json
+from collections import Counter
+from typing import Optional
 from worlds.AutoWorld import World
 from BaseClasses import MultiWorld, ItemClassification
+import Utils
 
 
 class ValidationError(Exception):
     pass
 
-class DataValidation():
-    game_table = {}
-    item_table = []
-    location_table = []
-    region_table = {}
+def parse_requires(requires) -> list[tuple[bool, str]]:
+    """Returns the (is category, name) of every item and item category a requires names, in the order it names them."""
+    requirements = []
 
+    if isinstance(requires, str):
+        # parse user written statement into list of each item
+        for item in re.findall(r'\|[^|]+\|', requires):
+            item_name = item.replace("|", "").split(":")[0]
 
-    @staticmethod
-    def checkItemNamesInLocationRequires():
-        for location in DataValidation.location_table:
-            if "requires" not in location:
-                continue
-
-            if isinstance(location["requires"], str):
-                # parse user written statement into list of each item
-                for item in re.findall(r'\|[^|]+\|', location["requires"]):
-                    if item.lower() == "or" or item.lower() == "and" or item == ")" or item == "(":
-                        continue
-                    else:
-                        # if it's a category, validate that the category exists
-                        if '@' in item:
-                            item = item.replace("|", "")
-                            item_parts = item.split(":")
-                            item_name = item
+            # categories are written |@Category| or |@Category:count|
+            if '@' in item:
+                requirements.append((True, item_name[1:]))
+            else:
+                requirements.append((False, item_name))
 
-                            if len(item_parts) > 1:
-                                item_name = item_parts[0]
+    else:  # item access is in dict form
+        for item in requires:
+            # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
+            if (isinstance(item, dict) and "or" in item and isinstance(item["or"], list)) or (isinstance(item, list)):
+                or_items = item["or"] if isinstance(item, dict) else item
+                requirements.extend((False, or_item.split(":")[0]) for or_item in or_items)
+            else:
+                requirements.append((False, item.split(":")[0]))
 
-                            item_name = item_name[1:]
-                            item_category_exists = len([item for item in DataValidation.item_table if item_name in item.get('category', [])]) > 0
+    return requirements
 
-                            if not item_category_exists:
-                                raise ValidationError("Item category %s is required by location %s but is misspelled or does not exist." % (item_name, location["name"]))
 
-                            continue
+def get_piped_names(requires) -> list[str]:
+    """Returns every name between two consecutive pipes in the requires once converted to json,
+    which are all the names `'|name|' in json.dumps(requires)` is true for."""
+    return json.dumps(requires).split("|")[1:-1]
 
-                        item = item.replace("|", "")
 
-                        item_parts = item.split(":")
-                        item_name = item
+class DataIndex:
+    """Lookups over the tables built in a single pass, shared by the validation checks so none of them has to
+    search a table for every entry of another one."""
+    def __init__(self, item_table: list, location_table: list, region_table: dict):
+        self.tables = (item_table, location_table, region_table)
 
-                        if len(item_parts) > 1:
-                            item_name = item_parts[0]
+        self.item_names = {item["name"] for item in item_table}
+        self.item_categories = {category for item in item_table for category in item.get("category", [])}
+        self.region_names = set(region_table)
 
-                        item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
+        # the regions each region connects to, and every region that something connects to
+        self.region_connections = {name: region["connects_to"] for name, region in region_table.items() if "connects_to" in region}
+        self.connected_regions = {connecting_region for connecting_regions in self.region_connections.values() for connecting_region in connecting_regions}
 
-                        if not item_exists:
-                            raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (item_name, location["name"]))
+        # the items and categories of every requires, and the first location/region each piped name is required by
+        self.location_requires = [(location["name"], parse_requires(location["requires"])) for location in location_table if "requires" in location]
+        self.region_requires = [(name, parse_requires(region["requires"])) for name, region in region_table.items() if "requires" in region]
+        self.location_requires_names: dict[str, str] = {}
+        self.region_requires_names: dict[str, str] = {}
 
-            else:  # item access is in dict form
-                for item in location["requires"]:
-                    # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
-                    if (isinstance(item, dict) and "or" in item and isinstance(item["or"], list)) or (isinstance(item, list)):
-                        or_items = item
+        for location in location_table:
+            if "requires" in location:
+                for name in get_piped_names(location["requires"]):
+                    self.location_requires_names.setdefault(name, location["name"])
 
-                        if isinstance(item, dict):
-                            or_items = item["or"]
+        for region_name, region in region_table.items():
+            if "requires" in region:
+                for name in get_piped_names(region["requires"]):
+                    self.region_requires_names.setdefault(name, region_name)
 
-                        for or_item in or_items:
-                            or_item_parts = or_item.split(":")
-                            or_item_name = or_item
 
-                            if len(or_item_parts) > 1:
-                                or_item_name = or_item_parts[0]
+class DataValidation():
+    game_table = {}
+    item_table = []
+    location_table = []
+    region_table = {}
+    index: Optional[DataIndex] = None
 
-                            item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == or_item_name]) > 0
 
-                            if not item_exists:
-                                raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (or_item_name, location["name"]))
-                    else:
-                        item_parts = item.split(":")
-                        item_name = item
+    @staticmethod
+    def get_index() -> "DataIndex":
+        """Returns the index of the current tables, building it again if one of them was replaced since."""
+        tables = (DataValidation.item_table, DataValidation.location_table, DataValidation.region_table)
+        index = DataValidation.index
+        if index is None or any(table is not indexed for table, indexed in zip(tables, index.tables)):
+            index = DataValidation.index = DataIndex(*tables)
+        return index
 
-                        if len(item_parts) > 1:
-                            item_name = item_parts[0]
+    @staticmethod
+    def checkItemNamesInLocationRequires():
+        index = DataValidation.get_index()
 
-                        item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
+        for location_name, requirements in index.location_requires:
+            for is_category, name in requirements:
+                if is_category and name not in index.item_categories:
+                    raise ValidationError("Item category %s is required by location %s but is misspelled or does not exist." % (name, location_name))
 
-                        if not item_exists:
-                            raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (item_name, location["name"]))
+                if not is_category and name not in index.item_names:
+                    raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (name, location_name))
 
     @staticmethod
     def checkItemNamesInRegionRequires():
-        for region_name in DataValidation.region_table:
-            region = DataValidation.region_table[region_name]
+        index = DataValidation.get_index()
 
-            if "requires" not in region:
-                continue
+        for region_name, requirements in index.region_requires:
+            for is_category, name in requirements:
+                if is_category and name not in index.item_categories:
+                    raise ValidationError("Item category %s is required by region %s but is misspelled or does not exist." % (name, region_name))
 
-            if isinstance(region["requires"], str):
-                # parse user written statement into list of each item
-                for item in re.findall(r'\|[^|]+\|', region["requires"]):
-                    if item.lower() == "or" or item.lower() == "and" or item == ")" or item == "(":
-                        continue
-                    else:
-                        # if it's a category, validate that the category exists
-                        if '@' in item:
-                            item = item.replace("|", "")
-                            item_parts = item.split(":")
-                            item_name = item
-
-                            if len(item_parts) > 1:
-                                item_name = item_parts[0]
-
-                            item_name = item_name[1:]
-                            item_category_exists = len([item for item in DataValidation.item_table if item_name in item.get('category', [])]) > 0
-
-                            if not item_category_exists:
-                                raise ValidationError("Item category %s is required by region %s but is misspelled or does not exist." % (item_name, region_name))
-
-                            continue
-
-                        item = item.replace("|", "")
-
-                        item_parts = item.split(":")
-                        item_name = item
-
-                        if len(item_parts) > 1:
-                            item_name = item_parts[0]
-
-                        item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
-
-                        if not item_exists:
-                            raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (item_name, region_name))
-
-            else:  # item access is in dict form
-                for item in region["requires"]:
-                    # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
-                    if (isinstance(item, dict) and "or" in item and isinstance(item["or"], list)) or (isinstance(item, list)):
-                        or_items = item
-
-                        if isinstance(item, dict):
-                            or_items = item["or"]
-
-                        for or_item in or_items:
-                            or_item_parts = or_item.split(":")
-                            or_item_name = or_item
-
-                            if len(or_item_parts) > 1:
-                                or_item_name = or_item_parts[0]
-
-                            item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == or_item_name]) > 0
-
-                            if not item_exists:
-                                raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (or_item_name, region_name))
-                    else:
-                        item_parts = item.split(":")
-                        item_name = item
-
-                        if len(item_parts) > 1:
-                            item_name = item_parts[0]
-
-                        item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
-
-                        if not item_exists:
-                            raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (item_name, region_name))
+                if not is_category and name not in index.item_names:
+                    raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (name, region_name))
 
     @staticmethod
     def checkRegionNamesInLocations():
+        index = DataValidation.get_index()
+
         for location in DataValidation.location_table:
             if "region" not in location or location["region"] in ["Menu", "Manual"]:
                 continue
 
-            region_exists = len([name for name in DataValidation.region_table if name == location["region"]]) > 0
-
-            if not region_exists:
+            if location["region"] not in index.region_names:
                 raise ValidationError("Region %s is set for location %s, but the region is misspelled or does not exist." % (location["region"], location["name"]))
 
     @staticmethod
     def checkItemsThatShouldBeRequired():
+        index = DataValidation.get_index()
+
         for item in DataValidation.item_table:
             # if the item is already progression, no need to check
             if "progression" in item and item["progression"]:
@@ -187,39 +144,12 @@ class DataValidation():
             if "progression_skip_balancing" in item and item["progression_skip_balancing"]:
                 continue
 
-            # check location requires for the presence of item name
-            for location in DataValidation.location_table:
-                if "requires" not in location:
-                    continue
-
-                # convert to json so we don't have to guess the data type
-                location_requires = json.dumps(location["requires"])
-
-                # if boolean, else legacy
-                if isinstance(location_requires, str):
-                    if '|{}|'.format(item["name"]) in location_requires:
-                        raise ValidationError("Item %s is required by location %s, but the item is not marked as progression." % (item["name"], location["name"]))
-                else:
-                    if item["name"] in location_requires:
-                        raise ValidationError("Item %s is required by location %s, but the item is not marked as progression." % (item["name"], location["name"]))
-
-            # check region requires for the presence of item name
-            for region_name in DataValidation.region_table:
-                region = DataValidation.region_table[region_name]
-
-                if "requires" not in region:
-                    continue
+            # check location requires, then region requires, for the presence of item name
+            if item["name"] in index.location_requires_names:
+                raise ValidationError("Item %s is required by location %s, but the item is not marked as progression." % (item["name"], index.location_requires_names[item["name"]]))
 
-                # convert to json so we don't have to guess the data type
-                region_requires = json.dumps(region["requires"])
-
-                # if boolean, else legacy
-                if isinstance(region_requires, str):
-                    if '|{}|'.format(item["name"]) in region_requires:
-                        raise ValidationError("Item %s is required by region %s, but the item is not marked as progression." % (item["name"], region_name))
-                else:
-                    if item["name"] in region_requires:
-                        raise ValidationError("Item %s is required by region %s, but the item is not marked as progression." % (item["name"], region_name))
+            if item["name"] in index.region_requires_names:
+                raise ValidationError("Item %s is required by region %s, but the item is not marked as progression." % (item["name"], index.region_requires_names[item["name"]]))
 
     @staticmethod
     def _checkLocationRequiresForItemValueWithRegex(values_requested: dict[str, int], requires) -> dict[str, int]:
@@ -290,41 +220,36 @@ class DataValidation():
 
     @staticmethod
     def checkRegionsConnectingToOtherRegions():
-        for region_name in DataValidation.region_table:
-            region = DataValidation.region_table[region_name]
+        index = DataValidation.get_index()
 
-            if "connects_to" not in region:
-                continue
-
-            for connecting_region in region["connects_to"]:
-                region_exists = len([name for name in DataValidation.region_table if name == connecting_region]) > 0
-
-                if not region_exists:
+        for region_name, connecting_regions in index.region_connections.items():
+            for connecting_region in connecting_regions:
+                if connecting_region not in index.region_names:
                     raise ValidationError("Region %s connects to a region %s, which is misspelled or does not exist." % (region_name, connecting_region))
 
     @staticmethod
     def checkForDuplicateItemNames():
-        for item in DataValidation.item_table:
-            name_count = len([i for i in DataValidation.item_table if i["name"] == item["name"]])
+        name_counts = Counter(item["name"] for item in DataValidation.item_table)
 
-            if name_count > 1:
+        for item in DataValidation.item_table:
+            if name_counts[item["name"]] > 1:
                 raise ValidationError("Item %s is defined more than once." % (item["name"]))
 
     @staticmethod
     def checkForDuplicateLocationNames():
-        for location in DataValidation.location_table:
-            name_count = len([l for l in DataValidation.location_table if l["name"] == location["name"]])
+        name_counts = Counter(location["name"] for location in DataValidation.location_table)
 
-            if name_count > 1:
+        for location in DataValidation.location_table:
+            if name_counts[location["name"]] > 1:
                 raise ValidationError("Location %s is defined more than once." % (location["name"]))
 
     @staticmethod
     def checkForDuplicateRegionNames():
         # this currently does nothing because the region name is a dict key, which will never be non-unique / limited to 1
-        for region_name in DataValidation.region_table:
-            name_count = len([r for r in DataValidation.region_table if r == region_name])
+        name_counts = Counter(region_name for region_name in DataValidation.region_table)
 
-            if name_count > 1:
+        for region_name in DataValidation.region_table:
+            if name_counts[region_name] > 1:
                 raise ValidationError("Region %s is defined more than once." % (region_name))
 
     @staticmethod
@@ -340,12 +265,12 @@ class DataValidation():
 
             if "items" in starting_block:
                 for item_name in starting_block["items"]:
-                    if not item_name in [item["name"] for item in DataValidation.item_table]:
+                    if not item_name in DataValidation.get_index().item_names:
                         raise ValidationError("Item %s is set as a starting item, but is misspelled or is not defined." % (item_name))
 
             if "item_categories" in starting_block:
                 for category_name in starting_block["item_categories"]:
-                    if len([item for item in DataValidation.item_table if "category" in item and category_name in item["category"]]) == 0:
+                    if not category_name in DataValidation.get_index().item_categories:
                         raise ValidationError("Item category %s is set as a starting item category, but is misspelled or is not defined on any items." % (category_name))
 
     @staticmethod
@@ -389,7 +314,7 @@ class DataValidation():
                 continue
 
             for item_name in place_item:
-                if not item_name in [item["name"] for item in DataValidation.item_table]:
+                if not item_name in DataValidation.get_index().item_names:
                     raise ValidationError("Item %s is placed (using place_item) on a location, but is misspelled or is not defined." % (item_name))
 
     @staticmethod
@@ -403,7 +328,7 @@ class DataValidation():
                 continue
 
             for category_name in place_item_category:
-                if len([item for item in DataValidation.item_table if "category" in item and category_name in item["category"]]) == 0:
+                if not category_name in DataValidation.get_index().item_categories:
                     raise ValidationError("Item category %s is placed (using place_item_category) on a location, but is misspelled or is not defined." % (category_name))
 
     @staticmethod
@@ -428,12 +353,11 @@ class DataValidation():
         if not using_starting_regions:
             return
 
+        index = DataValidation.get_index()
         nonstarting_regions = [region for region in DataValidation.region_table if not DataValidation.region_table[region].get("starting")]
 
         for nonstarter in nonstarting_regions:
-            regions_that_connect_to = [region for region in DataValidation.region_table if "connects_to" in DataValidation.region_table[region] and nonstarter in DataValidation.region_table[region]["connects_to"]]
-
-            if len(regions_that_connect_to) == 0:
+            if nonstarter not in index.connected_regions:
                 raise ValidationError("The region '%s' is set as a non-starting region, but has no regions that connect to it. It will be inaccessible." % nonstarter)
 
 
@@ -449,10 +373,82 @@ def runPreFillDataValidation(world: World, multiworld: MultiWorld):
         newline = "\n"
         raise Exception(f"\n\n{heading} \n\n{newline.join([' - ' + str(validation_error) for validation_error in validation_errors])}\n\n")
 
+######################
+# Validation cache
+#
+# The data ships read-only inside the apworld, so once it passed the generation checks they don't need to run again
+# until the json files or the code of the apworld change: besides the hooks and these checks, modules like Items.py and
+# Locations.py add to the tables that are validated. The hash of all of them is written to the user's cache folder
+# after a validation that passed, and the next generation with the same hash skips the checks.
+# Setting the POKECLICKER_FULL_VALIDATION environment variable (to anything but 0) always runs them.
+######################
+
+FULL_VALIDATION_VARIABLE = "POKECLICKER_FULL_VALIDATION"
+VALIDATION_CACHE_VERSION = 1
+
+
+def is_full_validation_forced() -> bool:
+    return os.environ.get(FULL_VALIDATION_VARIABLE, "0").strip() not in ("", "0")
+
+
+def get_validation_cache_path(game: str) -> str:
+    return Utils.cache_path("manual_validation", f"{game}.json")
+
+
+def get_validation_hash() -> str:
+    """Returns the hash of everything the generation checks depend on: the data files and hooks/Data.py (through
+    Data.get_data_hash), and every module of the apworld and of its hooks, since any of them can change the tables."""
+    from .Data import get_data_hash
+    from . import hooks
+
+    validation_hash = hashlib.sha256(get_data_hash().encode())
+    paths = [f"{module.name}.py" for module in sorted(pkgutil.iter_modules(sys.modules[__package__].__path__), key=lambda module: module.name)
+             if not module.ispkg]
+    paths += [f"hooks/{module.name}.py" for module in sorted(pkgutil.iter_modules(hooks.__path__), key=lambda module: module.name)]
+    for path in paths:
+        try:
+            contents = pkgutil.get_data(__package__, path)
+        except OSError:
+            contents = b""
+        validation_hash.update(path.encode())
+        validation_hash.update(len(contents).to_bytes(8, "little"))
+        validation_hash.update(contents)
+    return validation_hash.hexdigest()
+
+
+def is_validation_cached(game: str, validation_hash: str) -> bool:
+    try:
+        with open(get_validation_cache_path(game)) as cache_file:
+            cache = json.load(cache_file)
+    except (OSError, ValueError):
+        return False
+
+    return isinstance(cache, dict) and cache.get("version") == VALIDATION_CACHE_VERSION and cache.get("hash") == validation_hash
+
+
+def write_validation_cache(game: str, validation_hash: str):
+    path = get_validation_cache_path(game)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as cache_file:
+            json.dump({"version": VALIDATION_CACHE_VERSION, "hash": validation_hash}, cache_file)
+    except OSError as e:
+        # the checks simply run again next time
+        logging.debug(f"Manual: could not write the validation cache {path}: {e}")
+
+
 # Called during stage_assert_generate
 def runGenerationDataValidation(cls) -> None:
+    validation_hash = get_validation_hash()
+    if not is_full_validation_forced() and is_validation_cached(cls.game, validation_hash):
+        logging.debug(f"Manual: the data of {cls.game} is unchanged since it was last validated, skipping the validation.")
+        return
+
     validation_errors = []
 
+    # index the tables as they are now, the hooks may have changed them since the last generation
+    DataValidation.index = DataIndex(DataValidation.item_table, DataValidation.location_table, DataValidation.region_table)
+
     # check that requires have correct item names in locations and regions
     try: DataValidation.checkItemNamesInLocationRequires()
     except ValidationError as e: validation_errors.append(e)
@@ -509,3 +505,6 @@ def runGenerationDataValidation(cls) -> None:
         heading = f"ValidationError(s) in {cls.game}:";
 
         raise Exception("\n\n%s \n\n%s\n\n" % (heading, "\n".join([' - ' + str(validation_error) for validation_error in validation_errors])))
+
+    # only a validation that passed is cached, errors are reported again until they are fixed
+    write_validation_cache(cls.game, validation_hash)
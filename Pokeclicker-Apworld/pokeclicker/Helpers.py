@@ -1,14 +1,16 @@
 import ast
 import csv
+import functools
 import os
 import pkgutil
 import json
 
-from BaseClasses import MultiWorld, Item
+from BaseClasses import MultiWorld, Item, CollectionState
+from collections import Counter
 from enum import IntEnum
-from typing import Optional, List, TYPE_CHECKING, Union, get_args, get_origin, Any
-from types import GenericAlias
-from worlds.AutoWorld import World
+from typing import Optional, List, TYPE_CHECKING, Union, get_args, get_origin, Any, Callable, Iterable, Mapping
+from types import GenericAlias, MappingProxyType
+from worlds.AutoWorld import World, LogicMixin
 from .hooks.Helpers import before_is_category_enabled, before_is_item_enabled, before_is_location_enabled
 
 if TYPE_CHECKING:
@@ -232,6 +234,148 @@ def format_state_prog_items_key(category: str|ProgItemsCat ,key: str) -> str:
 
     return f"MANUAL_{cat_key}_{format_to_valid_identifier(key.lower())}"
 
+@functools.lru_cache(maxsize=None)
+def get_category_count_key(category: str) -> str:
+    """Return the key of the counter that collect/remove keep for the category, formatted only once per category"""
+    return format_state_prog_items_key(ProgItemsCat.CATEGORY, category)
+
+def count_category(state: CollectionState, category: str, player: int) -> int:
+    """Return how many items of the category the player has, like state.count_group(category, player) does for the category's item group.
+    It reads the running total kept by collect/remove, so it costs the same no matter how many items are in the category"""
+    return state.count(get_category_count_key(category), player)
+
+class PokeclickerStateMemo(LogicMixin):
+    """Keeps the results of the rule functions on the CollectionState they were computed for.\n
+    Every player has a version number that goes up whenever one of their items is collected or removed.\n
+    Their cached results are grouped by the items they depend on (see RuleDependencies.py),
+    and only the groups depending on the item that changed are dropped at the same time.\n
+    A copied state shares the groups of the state it was copied from, and each of them only copies a group
+    the first time it adds a result to it (see set_state_memo)."""
+    pokeclicker_state_versions: Counter[int]
+    pokeclicker_memo: dict[int, dict[int, dict[Any, Any]]]
+    pokeclicker_memo_owned: set[tuple[int, int]] # the (player, group) this state can write to without copying
+
+    def init_mixin(self, parent: MultiWorld):
+        self.pokeclicker_state_versions = Counter()
+        self.pokeclicker_memo = {}
+        self.pokeclicker_memo_owned = set()
+
+    def copy_mixin(self, new_state: CollectionState) -> CollectionState:
+        new_state.pokeclicker_state_versions = self.pokeclicker_state_versions.copy()
+        new_state.pokeclicker_memo = {player: groups.copy() for player, groups in self.pokeclicker_memo.items()}
+        # the groups are now shared by both states
+        new_state.pokeclicker_memo_owned = set()
+        self.pokeclicker_memo_owned = set()
+        return new_state
+
+# the memo groups are numbered by the set of items their results depend on, and every item knows the groups depending on it
+# results with unknown dependencies are in group 0, which is dropped whenever any item changes
+UNKNOWN_DEPENDENCIES_GROUP = 0
+_dependency_groups: dict[frozenset, int] = {}
+_item_dependency_groups: dict[str, list[int]] = {}
+
+def get_dependency_group(items: Optional[frozenset]) -> int:
+    """Return the memo group of results depending on these items (or on anything if None), registering it the first time"""
+    if items is None:
+        return UNKNOWN_DEPENDENCIES_GROUP
+    group = _dependency_groups.get(items)
+    if group is None:
+        group = _dependency_groups[items] = len(_dependency_groups) + 1
+        for item in items:
+            _item_dependency_groups.setdefault(item, []).append(group)
+    return group
+
+def get_state_version(state: CollectionState, player: int) -> int:
+    """Return the version of the player's items in this state, it changes every time one of their items is collected or removed"""
+    return state.pokeclicker_state_versions[player]
+
+def bump_state_version(state: CollectionState, player: int, item_name: Optional[str] = None):
+    """Mark the player's items in this state as changed, which invalidates every result memoized for them that depends on the item
+    (or every result if no item is given)"""
+    state.pokeclicker_state_versions[player] += 1
+    groups = state.pokeclicker_memo.get(player)
+    if not groups:
+        return
+    if item_name is None:
+        del state.pokeclicker_memo[player]
+        return
+    groups.pop(UNKNOWN_DEPENDENCIES_GROUP, None)
+    for group in _item_dependency_groups.get(item_name, ()):
+        groups.pop(group, None)
+
+_empty_memo: Mapping[Any, Any] = MappingProxyType({})
+
+def get_state_memo(state: CollectionState, player: int, group: int = UNKNOWN_DEPENDENCIES_GROUP) -> Mapping[Any, Any]:
+    """Return the memo of the player for this state and dependency group, valid until one of the group's items changes.\n
+    It can be shared with other copies of the state, so results are added with set_state_memo instead of writing to it"""
+    groups = state.pokeclicker_memo.get(player)
+    if groups is None:
+        return _empty_memo
+    return groups.get(group, _empty_memo)
+
+def set_state_memo(state: CollectionState, player: int, group: int, key: Any, value: Any):
+    """Add a result to the memo of the player for this state and dependency group, copying the group first
+    if it is still shared with the state it was copied from"""
+    groups = state.pokeclicker_memo.get(player)
+    if groups is None:
+        groups = state.pokeclicker_memo[player] = {}
+    memo = groups.get(group)
+    if memo is None or (player, group) not in state.pokeclicker_memo_owned:
+        memo = groups[group] = memo.copy() if memo else {}
+        state.pokeclicker_memo_owned.add((player, group))
+    memo[key] = value
+
+_memo_miss = object()
+
+def state_memoized(func: Callable) -> Callable:
+    """Decorator for rule functions taking (world, state, player, ...) that only depend on the player's items.\n
+    The result is cached by (function, args) in the state's memo, so calling it again with the same items is a single lookup.\n
+    Don't use it on functions that depend on something else that can change, like state.can_reach()
+    """
+    @functools.wraps(func)
+    def memoized(world: World, state: CollectionState, player: int, *args, **kwargs):
+        key = (func, args, tuple(kwargs.items())) if kwargs else (func, args)
+        result = get_state_memo(state, player, memoized.dependency_group).get(key, _memo_miss)
+        if result is _memo_miss:
+            result = func(world, state, player, *args, **kwargs)
+            set_state_memo(state, player, memoized.dependency_group, key, result)
+        return result
+    memoized.state_memoized = True
+    # set from the function's dependencies the first time rules are set, until then the result is kept until any item changes
+    memoized.dependency_group = UNKNOWN_DEPENDENCIES_GROUP
+    return memoized
+
+def depends_on(items: Iterable[str]|Callable[[], Iterable[str]] = (), categories: Iterable[str] = (), functions: Iterable[str] = ()) -> Callable:
+    """Decorator declaring what a rule function depends on, for the functions whose dependencies can't be found from their code.\n
+    It replaces the analysis of RuleDependencies.py for that function: the function depends on the items, the items of the categories
+    and whatever the named functions of hooks/Rules.py depend on.\n
+    The items can also be given as a function returning them, which is only called once the dependencies are needed.
+    """
+    def decorator(func: Callable) -> Callable:
+        func.declared_dependencies = (items if callable(items) else frozenset(items), frozenset(categories), tuple(functions))
+        return func
+    return decorator
+
+def state_independent(func: Callable) -> Callable:
+    """Decorator for rule functions that only depend on the world (like its options) and never on the state.\n
+    When the rules are set, a {function(args)} calling it is run once with None as the state, and what it returns
+    (a bool or a requires string) replaces the call in the compiled requires.\n
+    Functions that don't take a CollectionState at all are treated the same way without needing this decorator.
+    """
+    func.fold = func
+    return func
+
+def folded_by(fold: Callable) -> Callable:
+    """Decorator for rule functions that only depend on the state for some options.\n
+    When the rules are set, `fold` is called once with the same arguments as the function and None as the state.
+    If it returns a bool or a requires string, that replaces the call in the compiled requires,
+    if it returns None the function is called during access checks as usual.
+    """
+    def decorator(func: Callable) -> Callable:
+        func.fold = fold
+        return func
+    return decorator
+
 def convert_string_to_type(input: str, target_type: type) -> Any:
     """Take a string and attempt to convert it to {target_type}
     \ntarget_type can be a single type(ex. str), an union (int|str), an Optional type (Optional[str]) or a combo of any of those (Optional[int|str])
@@ -66,6 +66,11 @@ for item in item_table:
 item_id_to_name[None] = "__Victory__"
 item_name_to_id = {name: id for id, name in item_id_to_name.items()}
 
+def is_category_group(group_name: str) -> bool:
+    """Is the item group one of the item categories, and not one of the has_{value}_value groups?"""
+    item_names = item_name_groups.get(group_name)
+    return bool(item_names) and group_name in item_name_to_item[item_names[0]].get("category", [])
+
 
 ######################
 # Item classes
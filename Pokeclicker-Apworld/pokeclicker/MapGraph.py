@@ -0,0 +1,121 @@
+from typing import Callable, NamedTuple, Optional
+from graphlib import TopologicalSorter, CycleError
+
+from BaseClasses import CollectionState
+
+######################
+# Map graph
+#
+# The progression between towns, routes, dungeons and questlines is described in data/map.json instead of chains of functions.
+# Every node lists the gates it needs:
+#   "nodes": other nodes that must be reached first
+#   "items": items the player must have
+#   "attack": the expected attack the player must have
+#   "script": a script the player must have (when scripts are items)
+#   "or": a list of gates (with the same keys) where any one of them is enough
+#   "dungeon": true if the node is a dungeon, it also needs the attack to complete that dungeon
+#
+# The nodes are sorted once, so every node that can be reached is found in a single pass per state.
+# The depth of a node (how many nodes are chained before it) is used as the estimated cost of checking it.
+######################
+
+class MapGate(NamedTuple):
+    nodes: tuple[str, ...] = ()
+    items: tuple[str, ...] = ()
+    attack: int = 0
+    script: Optional[str] = None
+
+    def is_open(self, reached: set, state: CollectionState, player: int, attack: float, has_script: Callable[[str], bool]) -> bool:
+        for node in self.nodes:
+            if node not in reached:
+                return False
+        for item in self.items:
+            if not state.count(item, player):
+                return False
+        if attack < self.attack:
+            return False
+        return self.script is None or has_script(self.script)
+
+
+class MapNode(NamedTuple):
+    name: str
+    gate: MapGate
+    alternatives: tuple[MapGate, ...]
+    dungeon: bool
+
+    def dependencies(self) -> set[str]:
+        return set(self.gate.nodes).union(*(alternative.nodes for alternative in self.alternatives))
+
+
+class MapReach(NamedTuple):
+    """The nodes of the map the player can get to with the items of a state.\n
+    `entered` also has the dungeons whose gates are open but that the player may not have the attack to complete."""
+    reached: frozenset[str]
+    entered: frozenset[str]
+
+
+def parse_map_gate(node_name: str, data: dict) -> MapGate:
+    unknown_keys = set(data.keys()) - {"nodes", "items", "attack", "script", "or", "dungeon"}
+    if unknown_keys:
+        raise ValueError(f"The map node \"{node_name}\" has unknown key(s) {sorted(unknown_keys)}.")
+
+    return MapGate(tuple(data.get("nodes", [])), tuple(data.get("items", [])), int(data.get("attack", 0)), data.get("script"))
+
+
+class MapGraph:
+    """The nodes of data/map.json, kept in an order where every node comes after the nodes it needs."""
+    def __init__(self, map_table: dict):
+        nodes = {}
+        for name, data in map_table.items():
+            if name.startswith("$"):
+                continue
+            alternatives = tuple(parse_map_gate(name, alternative) for alternative in data.get("or", []))
+            nodes[name] = MapNode(name, parse_map_gate(name, data), alternatives, bool(data.get("dungeon", False)))
+
+        for node in nodes.values():
+            missing = node.dependencies() - nodes.keys()
+            if missing:
+                raise ValueError(f"The map node \"{node.name}\" needs unknown node(s) {sorted(missing)}.")
+
+        try:
+            order = TopologicalSorter({name: node.dependencies() for name, node in nodes.items()}).static_order()
+            self.order: tuple[MapNode, ...] = tuple(nodes[name] for name in order)
+        except CycleError as e:
+            raise ValueError(f"The map nodes {e.args[1]} need each other in a loop.") from e
+
+        self.nodes = nodes
+        self.depth: dict[str, int] = {}
+        for node in self.order:
+            self.depth[node.name] = 1 + max((self.depth[dependency] for dependency in node.dependencies()), default=0)
+
+    def item_names(self) -> frozenset[str]:
+        """Returns every item and script the gates of the map need."""
+        gates = [gate for node in self.order for gate in (node.gate, *node.alternatives)]
+        return frozenset(item for gate in gates for item in gate.items) | frozenset(gate.script for gate in gates if gate.script is not None)
+
+    def any_of(self, names: list[str]) -> tuple[str, ...]:
+        """Returns the nodes sorted by their estimated cost, the shallowest first, to be checked with `any`."""
+        missing = set(names) - self.nodes.keys()
+        if missing:
+            raise ValueError(f"Unknown map node(s) {sorted(missing)}.")
+        return tuple(sorted(set(names), key=lambda name: (self.depth[name], name)))
+
+    def explore(self, state: CollectionState, player: int, attack: float,
+                has_script: Callable[[str], bool], dungeon_attack: Callable[[str], int]) -> MapReach:
+        """Finds every node the player can get to, given the player's expected attack,
+        a check for scripts and the attack needed to complete a dungeon."""
+        reached = set()
+        entered = set()
+
+        for node in self.order:
+            if not node.gate.is_open(reached, state, player, attack, has_script):
+                continue
+            if node.alternatives and not any(alternative.is_open(reached, state, player, attack, has_script)
+                                             for alternative in node.alternatives):
+                continue
+
+            entered.add(node.name)
+            if not node.dungeon or attack >= dungeon_attack(node.name):
+                reached.add(node.name)
+
+        return MapReach(frozenset(reached), frozenset(entered))
@@ -1,26 +1,46 @@
 from BaseClasses import Entrance, MultiWorld, Region
 from .Helpers import is_category_enabled, is_location_enabled
-from .Data import region_table
+from . import Data
 from .Locations import ManualLocation, location_name_to_location
 from worlds.AutoWorld import World
 
+import functools
 
-if not region_table:
-    region_table = {}
 
-regionMap = { **region_table }
-starting_regions = [ name for name in regionMap if "starting" in regionMap[name].keys() and regionMap[name]["starting"] ]
+# the region map is only built when the regions are first needed, regionMap and starting_regions are still importable from here
+@functools.cache
+def get_region_map() -> dict:
+    """Returns the regions of regions.json, plus the Manual region connecting to the starting regions."""
+    region_table = Data.region_table or {}
 
-if len(starting_regions) == 0:
-    starting_regions = region_table.keys() # the Manual region connects to all user-defined regions automatically if you specify no starting regions
+    regionMap = { **region_table }
+    regionMap["Manual"] = {
+        "requires": [],
+        "connects_to": get_starting_regions()
+    }
+    return regionMap
 
-regionMap["Manual"] = {
-    "requires": [],
-    "connects_to": starting_regions
-}
+@functools.cache
+def get_starting_regions() -> list:
+    region_table = Data.region_table or {}
+    starting_regions = [ name for name in region_table if "starting" in region_table[name].keys() and region_table[name]["starting"] ]
+
+    if len(starting_regions) == 0:
+        starting_regions = region_table.keys() # the Manual region connects to all user-defined regions automatically if you specify no starting regions
+
+    return starting_regions
+
+def __getattr__(attribute: str):
+    if attribute == "regionMap":
+        return get_region_map()
+    if attribute == "starting_regions":
+        return get_starting_regions()
+    raise AttributeError(f"module {__name__!r} has no attribute {attribute!r}")
 
 
 def create_regions(world: World, multiworld: MultiWorld, player: int):
+    regionMap = get_region_map()
+
     # Create regions and assign locations to each region
     for region in regionMap:
         if "connects_to" not in regionMap[region]:
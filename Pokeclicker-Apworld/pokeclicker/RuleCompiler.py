@@ -0,0 +1,594 @@
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple, Optional
+from enum import IntEnum
+
+from .Helpers import clamp, get_category_count_key, get_state_memo, set_state_memo, get_dependency_group
+
+from BaseClasses import CollectionState
+
+import re
+import math
+
+if TYPE_CHECKING:
+    from . import ManualWorld
+
+######################
+# Requires compilation
+#
+# A string requires is parsed once into a tree of requirement objects, which is cached by its text.
+# Access checks then only evaluate that tree instead of re-parsing the string.
+#
+# Every requirement has a rough `cost`. The operands of an AND/OR chain are evaluated cheapest first
+# and stop as soon as the result is known, so item counts run before any hooks function gets called.
+#
+# Identical sub-expressions are shared between every requires of a world, and the shared chains that call
+# functions keep their result on the state until the player's items change.
+#
+# Every requirement also knows the items it depends on (None if it can be anything), so a shared chain's memoized
+# result is only dropped when one of its items is collected or removed.
+#
+# Functions that don't depend on the state (like the ones only reading options) are called once when compiled,
+# and their result is folded in: an AND with a false operand is false, an OR with a true operand is true.
+#
+# Since the nodes are shared by every location and region using them, they don't know which one they were compiled for.
+# An error raised while a rule is checked is given the name of its location or region by the AreaRule checking it.
+######################
+
+FUNCTION_PATTERN = re.compile(r'\{(\w+)\((.*?)\)\}')
+ITEM_PATTERN = re.compile(r'\|[^|]+\|')
+OPERATOR_PATTERN = re.compile(r'\s?\b(AND|OR)\b\s?', re.IGNORECASE)
+
+
+class LogicErrorSource(IntEnum):
+    INFIX_TO_POSTFIX = 1 # includes more closing parentheses than opening (but not the opposite)
+    EVALUATE_POSTFIX = 2 # includes missing pipes and missing value on either side of AND/OR
+    EVALUATE_STACK_SIZE = 3 # includes missing curly brackets
+
+def construct_logic_error(location_or_region: dict, source: LogicErrorSource) -> KeyError:
+    object_type = "location/region"
+    object_name = location_or_region.get("name", "Unknown")
+
+    if location_or_region.get("is_region", False) or "starting" in location_or_region or "connects_to" in location_or_region:
+        object_type = "region"
+    elif "region" in location_or_region or "category" in location_or_region:
+        object_type = "location"
+
+    if source == LogicErrorSource.INFIX_TO_POSTFIX:
+        source_text = "There may be mismatched parentheses, or other invalid syntax for the requires."
+    elif source == LogicErrorSource.EVALUATE_POSTFIX:
+        source_text = "There may be missing || around item names, or an AND/OR that is missing a value on one side, or other invalid syntax for the requires."
+    elif source == LogicErrorSource.EVALUATE_STACK_SIZE:
+        source_text = "There may be missing {} around requirement functions like YamlEnabled() / YamlDisabled(), or other invalid syntax for the requires."
+    else:
+        source_text = "This requires includes invalid syntax."
+
+    return KeyError(f"Invalid 'requires' for {object_type} '{object_name}': {source_text} (ERROR {source})")
+
+
+class RequireFunctionError(RuntimeError):
+    """An exception raised by a {function(args)} of a requires. The location or region whose requires called it
+    is only known (and added to the message) once it reaches the AreaRule being checked."""
+    def __init__(self, func_name: str, func_args: str, error: Exception, area_type: Optional[str] = None, area_name: Optional[str] = None):
+        self.func_name = func_name
+        self.func_args = func_args
+        self.error = error
+        self.area_type = area_type
+        self.area_name = area_name
+
+        if area_name is None:
+            message = f'A call to the function "{func_name}" in a requires raised an Exception. \
+                        \nUnless it was called by another function, it should look something like "{{{func_name}({func_args})}}" in locations.json or regions.json.'
+        else:
+            message = f'A call to the function "{func_name}" in {area_type} "{area_name}"\'s requires raised an Exception. \
+                        \nUnless it was called by another function, it should look something like "{{{func_name}({func_args})}}" in {area_type}s.json.'
+        super().__init__(f'{message} \
+                           \nFull error message: \
+                           \n\n{type(error).__name__}: {error}')
+
+    def in_area(self, area_type: str, area_name: str) -> "RequireFunctionError":
+        return RequireFunctionError(self.func_name, self.func_args, self.error, area_type, area_name)
+
+
+class ConstantRequirement:
+    """A literal 0 or 1 left in the requires."""
+    cost = 0
+    memoizable = True
+    dependencies = frozenset()
+
+    def __init__(self, value: bool):
+        self.value = value
+
+    def share_key(self) -> tuple:
+        return (ConstantRequirement, self.value)
+
+    def evaluate(self, state: CollectionState) -> bool:
+        return self.value
+
+
+class ItemRequirement:
+    """An |Item| or |Item:count| token. An 'all', 'half' or 'N%' count is resolved once against the item pool."""
+    cost = 1
+    memoizable = True
+
+    def __init__(self, compiler: "RequiresCompiler", item_name: str, item_count: str):
+        self.compiler = compiler
+        self.item_name = item_name
+        self.item_count = parse_item_count(item_count)
+        self.dependencies = frozenset([item_name])
+
+        if not isinstance(self.item_count, int):
+            items_counts = compiler.world.get_item_counts(compiler.player, only_progression=True)
+            self.item_count = resolve_item_count(self.item_count, items_counts.get(item_name, 0))
+
+    def share_key(self) -> tuple:
+        return (ItemRequirement, self.item_name, self.item_count)
+
+    def evaluate(self, state: CollectionState) -> bool:
+        return state.count(self.item_name, self.compiler.player) >= self.item_count
+
+
+class CategoryRequirement:
+    """An |@Category| or |@Category:count| token. It reads the category counter kept up to date by collect/remove,
+    and an 'all', 'half' or 'N%' count is resolved once against the category's progression items in the pool."""
+    cost = 1
+    memoizable = True
+
+    def __init__(self, compiler: "RequiresCompiler", category_name: str, item_count: str):
+        self.compiler = compiler
+        self.category_name = category_name
+        self.counter_key = get_category_count_key(category_name)
+        self.dependencies = frozenset(compiler.world.item_name_groups.get(category_name, []))
+        self.item_count = parse_item_count(item_count)
+
+        if not isinstance(self.item_count, int):
+            category_counts = compiler.world.get_category_counts(compiler.player)
+            self.item_count = resolve_item_count(self.item_count, category_counts.get(category_name, 0))
+
+    def share_key(self) -> tuple:
+        return (CategoryRequirement, self.category_name, self.item_count)
+
+    def evaluate(self, state: CollectionState) -> bool:
+        return state.count(self.counter_key, self.compiler.player) >= self.item_count
+
+
+class FunctionRequirement:
+    """A {function(args)} token. The function and its arguments are resolved when compiled, so evaluating it only
+    calls the function with the state. If it returns a requires string instead of a bool, that string is compiled
+    (and cached) like any other requires."""
+    cost = 100
+
+    def __init__(self, compiler: "RequiresCompiler", func_name: str, func_args: str, area: dict, depth: int):
+        self.compiler = compiler
+        self.func_name = func_name
+        self.func_args = func_args
+        self.depth = depth
+        self.call = compiler.bind(func_name, func_args, area)
+        # only functions that depend on nothing but the player's items can have their result reused for the same items
+        self.memoizable = getattr(self.call, "memoizable", False)
+        self.dependencies = getattr(self.call, "dependencies", None)
+
+    def share_key(self) -> tuple:
+        return (FunctionRequirement, self.func_name, self.func_args, self.depth)
+
+    def evaluate(self, state: CollectionState) -> bool:
+        result = self.call(state)
+
+        if isinstance(result, bool):
+            return result
+
+        try:
+            compiled = self.compiler.compile(str(result), {"name": f"{{{self.func_name}({self.func_args})}}"}, self.depth + 1)
+        except Exception as ex:
+            raise RequireFunctionError(self.func_name, self.func_args, ex)
+        return compiled.evaluate(state)
+
+
+def combine_dependencies(requirements) -> Optional[frozenset]:
+    """Returns every item the requirements depend on, or None if one of them can depend on anything."""
+    dependencies = set()
+    for requirement in requirements:
+        if requirement.dependencies is None:
+            return None
+        dependencies.update(requirement.dependencies)
+    return frozenset(dependencies)
+
+
+class AllOfRequirement:
+    """An AND chain. Stops at the first requirement that isn't met."""
+    def __init__(self, requirements: tuple):
+        self.requirements = requirements
+        self.cost = sum(requirement.cost for requirement in requirements)
+        self.memoizable = all(requirement.memoizable for requirement in requirements)
+        self.dependencies = combine_dependencies(requirements)
+
+    def share_key(self) -> tuple:
+        return (type(self), frozenset(id(requirement) for requirement in self.requirements))
+
+    def evaluate(self, state: CollectionState) -> bool:
+        for requirement in self.requirements:
+            if not requirement.evaluate(state):
+                return False
+        return True
+
+
+class AnyOfRequirement:
+    """An OR chain. Stops at the first requirement that is met."""
+    def __init__(self, requirements: tuple):
+        self.requirements = requirements
+        self.cost = sum(requirement.cost for requirement in requirements)
+        self.memoizable = all(requirement.memoizable for requirement in requirements)
+        self.dependencies = combine_dependencies(requirements)
+
+    def share_key(self) -> tuple:
+        return (type(self), frozenset(id(requirement) for requirement in self.requirements))
+
+    def evaluate(self, state: CollectionState) -> bool:
+        for requirement in self.requirements:
+            if requirement.evaluate(state):
+                return True
+        return False
+
+
+class NotRequirement:
+    """A ! in front of a requirement."""
+    def __init__(self, requirement):
+        self.requirement = requirement
+        self.cost = requirement.cost
+        self.memoizable = requirement.memoizable
+        self.dependencies = requirement.dependencies
+
+    def share_key(self) -> tuple:
+        return (NotRequirement, id(self.requirement))
+
+    def evaluate(self, state: CollectionState) -> bool:
+        return not self.requirement.evaluate(state)
+
+
+class SharedRequirement:
+    """An AND/OR chain calling rule functions that is shared by the rules of a world.
+    Its result is memoized on the state, so it is evaluated at most once until one of the items it depends on changes."""
+    memoizable = True
+
+    def __init__(self, requirement, player: int):
+        self.requirement = requirement
+        self.player = player
+        self.cost = requirement.cost
+        self.dependencies = requirement.dependencies
+        self.group = get_dependency_group(requirement.dependencies)
+
+    def share_key(self) -> tuple:
+        return self.requirement.share_key()
+
+    def evaluate(self, state: CollectionState) -> bool:
+        result = get_state_memo(state, self.player, self.group).get(self)
+        if result is None:
+            result = self.requirement.evaluate(state)
+            set_state_memo(state, self.player, self.group, self, result)
+        return result
+
+
+ALWAYS_TRUE = ConstantRequirement(True)
+ALWAYS_FALSE = ConstantRequirement(False)
+
+
+def all_of(*requirements):
+    """Combines already compiled requirements into a single one that needs all of them."""
+    if ALWAYS_FALSE in requirements:
+        return ALWAYS_FALSE
+    requirements = tuple(requirement for requirement in requirements if requirement is not ALWAYS_TRUE)
+    if not requirements:
+        return ALWAYS_TRUE
+    if len(requirements) == 1:
+        return requirements[0]
+
+    operands = []
+    for requirement in requirements:
+        if isinstance(requirement, AllOfRequirement):
+            operands.extend(requirement.requirements)
+        else:
+            operands.append(requirement)
+    return AllOfRequirement(tuple(sorted(operands, key=lambda operand: operand.cost)))
+
+
+class AreaRule(NamedTuple):
+    """The access rule of an entrance or a location, built once when the rules are set.
+    Checking it only evaluates the compiled requirement, nothing is looked up or written.
+    The area is the location or region whose requires it checks, named in the errors the requirement raises."""
+    name: str
+    requirement: Any
+    area_type: str = "location"
+    area_name: Optional[str] = None
+
+    def __call__(self, state: CollectionState) -> bool:
+        try:
+            return self.requirement.evaluate(state)
+        except RequireFunctionError as ex:
+            if ex.area_name is not None:
+                raise
+            raise ex.in_area(self.area_type, self.area_name or self.name) from ex.error
+
+
+class RequiresCompiler:
+    """Compiles the requires strings of a single world and keeps them cached by their text."""
+    def __init__(self, world: "ManualWorld", player: int, bind_function: Callable[[str, str, dict], Callable[[CollectionState], Any]]):
+        self.world = world
+        self.player = player
+        self.bind_function = bind_function
+        self.calls: dict[tuple[str, str], Callable[[CollectionState], Any]] = {}
+        self.cache: dict[tuple[str, int], Any] = {}
+        self.list_cache: dict[tuple[tuple, tuple], Any] = {}
+        self.shared: dict[tuple, Any] = {ALWAYS_TRUE.share_key(): ALWAYS_TRUE, ALWAYS_FALSE.share_key(): ALWAYS_FALSE}
+
+    def compile(self, requires: str|list, area: dict, depth: int = 0):
+        if not isinstance(requires, str):
+            return self.compile_list(requires, area)
+
+        if requires == "":
+            return ALWAYS_TRUE
+
+        key = (requires, depth)
+        compiled = self.cache.get(key)
+
+        if compiled is None:
+            tokens = self.tokenize(requires, area, depth)
+            compiled = self.share(postfix_to_tree(tokens_to_postfix(tokens, area)))
+            self.cache[key] = compiled
+
+        return compiled
+
+    def compile_list(self, requires: list, area: dict):
+        """Compiles the list form of requires, where every "Item:count" entry is required unless
+        one of the lists (or {"or": [...]} objects) in it has all of its own items."""
+        groups = []
+        items = []
+
+        for entry in requires:
+            # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
+            if (isinstance(entry, dict) and "or" in entry and isinstance(entry["or"], list)) or isinstance(entry, list):
+                or_items = entry["or"] if isinstance(entry, dict) else entry
+                groups.append(tuple(or_items))
+            else:
+                items.append(entry)
+
+        if not groups and not items:
+            return ALWAYS_TRUE
+
+        key = (tuple(groups), tuple(items))
+        compiled = self.list_cache.get(key)
+
+        if compiled is None:
+            any_of = [AllOfRequirement(tuple(self.create_list_item_requirement(item, area) for item in group)) for group in groups]
+            any_of.append(AllOfRequirement(tuple(self.create_list_item_requirement(item, area) for item in items)))
+            compiled = self.share(AnyOfRequirement(tuple(any_of)) if len(any_of) > 1 else any_of[0])
+            self.list_cache[key] = compiled
+
+        return compiled
+
+    def share(self, requirement):
+        """Returns the node every rule of this world uses for this requirement, so identical sub-expressions
+        are only built (and evaluated) once. The operands of AND/OR chains are sorted by cost on the way,
+        and constants are folded away."""
+        if isinstance(requirement, NotRequirement):
+            operand = self.share(requirement.requirement)
+            if isinstance(operand, ConstantRequirement):
+                return ALWAYS_FALSE if operand.value else ALWAYS_TRUE
+            requirement = NotRequirement(operand)
+        elif isinstance(requirement, (AllOfRequirement, AnyOfRequirement)):
+            # a true operand decides an OR, a false one decides an AND, and the other constant can be dropped
+            deciding_value = isinstance(requirement, AnyOfRequirement)
+            operands = []
+            for operand in requirement.requirements:
+                operand = self.share(operand)
+                if not isinstance(operand, ConstantRequirement):
+                    operands.append(operand)
+                elif operand.value == deciding_value:
+                    return ALWAYS_TRUE if deciding_value else ALWAYS_FALSE
+
+            if not operands:
+                return ALWAYS_FALSE if deciding_value else ALWAYS_TRUE
+            if len(operands) == 1:
+                return operands[0]
+            requirement = type(requirement)(tuple(sorted(operands, key=lambda operand: operand.cost)))
+
+        key = requirement.share_key()
+        shared = self.shared.get(key)
+
+        if shared is None:
+            shared = requirement
+            # item counts are cheaper to check again than to look up in the memo, so only chains calling functions are memoized
+            if isinstance(requirement, (AllOfRequirement, AnyOfRequirement)) and requirement.memoizable \
+                    and requirement.cost >= FunctionRequirement.cost:
+                shared = SharedRequirement(requirement, self.player)
+            self.shared[key] = shared
+
+        return shared
+
+    def bind(self, func_name: str, func_args: str, area: dict) -> Callable[[CollectionState], Any]:
+        """Returns the call of a {function(args)}, bound (and folded) only the first time it is found in a requires."""
+        key = (func_name, func_args)
+        call = self.calls.get(key)
+
+        if call is None:
+            call = self.calls[key] = self.bind_function(func_name, func_args, area)
+
+        return call
+
+    def create_list_item_requirement(self, item: str, area: dict):
+        item_parts = item.split(":")
+        item_name = item
+        item_count = "1"
+
+        if len(item_parts) > 1:
+            item_name = item_parts[0]
+            item_count = item_parts[1]
+
+        try:
+            return ItemRequirement(self, item_name, str(int(item_count)))
+        except ValueError as e:
+            raise ValueError(f"Invalid item count `{item_name}` in {area}.") from e
+
+    def tokenize(self, requires: str, area: dict, depth: int) -> list:
+        tokens = []
+        position = 0
+
+        found_functions = list(FUNCTION_PATTERN.finditer(requires))
+        if found_functions and depth > self.world.rules_functions_maximum_recursion:
+            area_type = "region" if area.get("is_region", False) else "location"
+            area_name = area.get("name", f"unknown with these parameters: {area}")
+            raise RecursionError(f'One or more functions in {area_type} "{area_name}"\'s requires looped too many time (maximum recursion is {self.world.rules_functions_maximum_recursion}) \
+                                 \n    As of this Exception the following function(s) are waiting to run: {[f.group(1) for f in found_functions]} \
+                                 \n    And the currently processed requires look like this: "{requires}"')
+
+        for function in found_functions:
+            self.tokenize_text(requires[position:function.start()], area, tokens)
+            tokens.append(self.fold_function(FunctionRequirement(self, function.group(1), function.group(2), area, depth), area))
+            position = function.end()
+
+        self.tokenize_text(requires[position:], area, tokens)
+        return tokens
+
+    def fold_function(self, requirement: FunctionRequirement, area: dict):
+        """Replaces a call to a function that doesn't depend on the state with what it returned when it was bound."""
+        if not hasattr(requirement.call, "folded"):
+            return requirement
+
+        result = requirement.call.folded
+        if isinstance(result, bool):
+            return ALWAYS_TRUE if result else ALWAYS_FALSE
+
+        return self.compile(str(result), area, requirement.depth + 1)
+
+    def tokenize_text(self, text: str, area: dict, tokens: list):
+        position = 0
+
+        for item in ITEM_PATTERN.finditer(text):
+            tokenize_operators(text[position:item.start()], tokens)
+            tokens.append(self.create_item_requirement(item.group(0), area))
+            position = item.end()
+
+        tokenize_operators(text[position:], tokens)
+
+    def create_item_requirement(self, item: str, area: dict):
+        require_type = 'category' if '|@' in item else 'item'
+
+        item = item.lstrip('|@$').rstrip('|')
+        item_parts = item.split(":")
+        item_name = item
+        item_count = "1"
+
+        if len(item_parts) > 1:
+            item_name = item_parts[0].strip()
+            item_count = item_parts[1].strip()
+
+        try:
+            if require_type == 'category':
+                return CategoryRequirement(self, item_name, item_count)
+            return ItemRequirement(self, item_name, item_count)
+        except ValueError as e:
+            raise ValueError(f"Invalid item count `{item_name}` in {area}.") from e
+
+
+def tokenize_operators(text: str, tokens: list):
+    """Keeps only what the requires grammar understands outside of items and functions:
+    AND/OR (or their & and | symbols), !, parentheses and literal 0/1. Anything else is ignored."""
+    text = OPERATOR_PATTERN.sub(lambda match: "&" if match.group(1).upper() == "AND" else "|", text)
+
+    for c in text:
+        if c in "&|!()":
+            tokens.append(c)
+        elif c == "0":
+            tokens.append(ConstantRequirement(False))
+        elif c == "1":
+            tokens.append(ConstantRequirement(True))
+
+
+def tokens_to_postfix(tokens: list, area: dict) -> tuple:
+    """Shunting-yard over the tokens. AND and OR share the same precedence and are left associative."""
+    prec = {"&": 2, "|": 2, "!": 3}
+    stack = []
+    postfix = []
+
+    try:
+        for token in tokens:
+            if not isinstance(token, str):
+                postfix.append(token)
+            elif token in prec:
+                while stack and stack[-1] != "(" and prec[token] <= prec[stack[-1]]:
+                    postfix.append(stack.pop())
+                stack.append(token)
+            elif token == "(":
+                stack.append(token)
+            elif token == ")":
+                while stack and stack[-1] != "(":
+                    postfix.append(stack.pop())
+                stack.pop()
+
+        while stack:
+            token = stack.pop()
+            if token != "(": # unclosed parentheses are ignored
+                postfix.append(token)
+    except Exception:
+        raise construct_logic_error(area, LogicErrorSource.INFIX_TO_POSTFIX)
+
+    # validate the program once, so evaluating it never has to
+    stack_size = 0
+    for instruction in postfix:
+        if instruction in ("&", "|"):
+            if stack_size < 2:
+                raise construct_logic_error(area, LogicErrorSource.EVALUATE_POSTFIX)
+            stack_size -= 1
+        elif instruction == "!":
+            if stack_size < 1:
+                raise construct_logic_error(area, LogicErrorSource.EVALUATE_POSTFIX)
+        else:
+            stack_size += 1
+
+    if stack_size != 1:
+        raise construct_logic_error(area, LogicErrorSource.EVALUATE_STACK_SIZE)
+
+    return tuple(postfix)
+
+
+def postfix_to_tree(postfix: tuple):
+    """Builds the requirement tree out of a validated postfix program. Chains of the same operator are flattened."""
+    stack = []
+
+    for instruction in postfix:
+        if instruction == "!":
+            stack.append(NotRequirement(stack.pop()))
+        elif instruction in ("&", "|"):
+            op2 = stack.pop()
+            op1 = stack.pop()
+            chain_type = AllOfRequirement if instruction == "&" else AnyOfRequirement
+            operands = []
+            for operand in (op1, op2):
+                if isinstance(operand, chain_type):
+                    operands.extend(operand.requirements)
+                else:
+                    operands.append(operand)
+            stack.append(chain_type(tuple(operands)))
+        else:
+            stack.append(instruction)
+
+    return stack.pop()
+
+
+def parse_item_count(item_count: str) -> int|str:
+    """Converts the count of an item token to an int, or keeps 'all', 'half' and 'N%' to be resolved against the item pool."""
+    lowered = item_count.lower()
+    if lowered in ('all', 'half'):
+        return lowered
+    if item_count.endswith('%') and len(item_count) > 1:
+        float(item_count[:-1])
+        return item_count
+    return int(item_count)
+
+
+def resolve_item_count(item_count: str, pool_count: int) -> int:
+    """Resolves 'all', 'half' and 'N%' against the number of matching items in the pool."""
+    if item_count == 'all':
+        return pool_count
+    elif item_count == 'half':
+        return int(pool_count / 2)
+    else:
+        percent = clamp(float(item_count[:-1]) / 100, 0, 1)
+        return math.ceil(pool_count * percent)
@@ -0,0 +1,206 @@
+from typing import Any, NamedTuple, Optional
+from types import ModuleType
+
+from .Helpers import get_dependency_group
+
+import ast
+import inspect
+import logging
+
+######################
+# Rule dependencies
+#
+# The items a function of hooks/Rules.py depends on are found once from its code, so the results memoized on a state
+# are only dropped when an item they depend on is collected or removed.
+#
+# Only these uses of the state are understood:
+#   state.count("Item", player), state.has("Item", player, ...) and the same with a parameter of the function as the item
+#   state.has_all/has_any/count_from_list(["Item", ...], player)
+#   state.count_group/has_group("Category", player) and count_category(state, "Category", player)
+#   passing the state to another function of hooks/Rules.py, which adds that function's dependencies
+# Any other use of the state (like state.can_reach) makes the function depend on everything, and so does returning
+# a string, since the requires string it returns can need any item.
+# A function can declare its dependencies with @depends_on(...) (from Helpers.py) instead, when its code can't be read this way.
+######################
+
+ITEM_METHODS = ("count", "has")
+ITEM_LIST_METHODS = ("has_all", "has_any", "count_from_list")
+CATEGORY_METHODS = ("count_group", "has_group")
+
+
+class ItemArgument(NamedTuple):
+    """An argument that is an item name, either written in the code or received as a parameter of the caller."""
+    item: Optional[str] = None
+    parameter: Optional[str] = None
+
+
+class FunctionDependencies(NamedTuple):
+    """What a single function reads from the state, before the functions it calls are followed."""
+    items: frozenset
+    categories: frozenset
+    parameters: frozenset
+    calls: tuple # (function name, {callee parameter: ItemArgument or None})
+    unknown: bool
+
+
+class RuleDependencies:
+    """The item dependencies of every function of a rules module (like hooks/Rules.py)."""
+    def __init__(self, module: ModuleType, category_items: dict[str, list[str]]):
+        self.module = module
+        self.category_items = category_items
+        self.functions = {name: func for name, func in vars(module).items()
+                          if inspect.isfunction(func) and func.__module__ == module.__name__}
+        self.analyzed: dict[str, FunctionDependencies] = {}
+        self.resolved: dict[str, Optional[tuple[frozenset, frozenset]]] = {}
+
+        try:
+            tree = ast.parse(inspect.getsource(module))
+        except (OSError, TypeError, SyntaxError) as e:
+            # without the source every function depends on everything, which is how the memo worked before
+            logging.warning(f"Could not read the source of {module.__name__} to find what its rules depend on: {e}")
+            return
+
+        for node in tree.body:
+            if isinstance(node, ast.FunctionDef) and node.name in self.functions:
+                self.analyzed[node.name] = self.analyze(node)
+
+    def analyze(self, node: ast.FunctionDef) -> FunctionDependencies:
+        parameters = [argument.arg for argument in node.args.posonlyargs + node.args.args + node.args.kwonlyargs]
+        state_names = {argument.arg for argument in node.args.posonlyargs + node.args.args + node.args.kwonlyargs
+                       if argument.arg == "state" or (isinstance(argument.annotation, ast.Name) and argument.annotation.id == "CollectionState")}
+
+        items, categories, item_parameters, calls = set(), set(), set(), []
+        state_uses = sum(1 for child in ast.walk(node) if isinstance(child, ast.Name) and child.id in state_names)
+        understood_uses = 0
+        unknown = False
+
+        def item_argument(argument: ast.expr) -> Optional[ItemArgument]:
+            if isinstance(argument, ast.Constant) and isinstance(argument.value, str):
+                return ItemArgument(item=argument.value)
+            if isinstance(argument, ast.Name) and argument.id in parameters and argument.id not in state_names:
+                return ItemArgument(parameter=argument.id)
+            return None
+
+        for child in ast.walk(node):
+            if not isinstance(child, ast.Call):
+                continue
+            function = child.func
+
+            # state.method(...)
+            if isinstance(function, ast.Attribute) and isinstance(function.value, ast.Name) and function.value.id in state_names:
+                understood_uses += 1
+                first = child.args[0] if child.args else None
+                if function.attr in ITEM_METHODS and first is not None:
+                    argument = item_argument(first)
+                    if argument is None:
+                        unknown = True
+                    elif argument.item is not None:
+                        items.add(argument.item)
+                    else:
+                        item_parameters.add(argument.parameter)
+                elif function.attr in ITEM_LIST_METHODS and isinstance(first, (ast.List, ast.Tuple, ast.Set)) \
+                        and all(isinstance(element, ast.Constant) and isinstance(element.value, str) for element in first.elts):
+                    items.update(element.value for element in first.elts)
+                elif function.attr in CATEGORY_METHODS and isinstance(first, ast.Constant) and isinstance(first.value, str):
+                    categories.add(first.value)
+                else:
+                    unknown = True
+                continue
+
+            if not isinstance(function, ast.Name):
+                continue
+            passed_state = sum(1 for argument in child.args + [keyword.value for keyword in child.keywords]
+                               if isinstance(argument, ast.Name) and argument.id in state_names)
+            if not passed_state:
+                continue
+
+            # count_category(state, "Category", player)
+            if function.id == "count_category":
+                understood_uses += passed_state
+                if len(child.args) > 1 and isinstance(child.args[1], ast.Constant) and isinstance(child.args[1].value, str):
+                    categories.add(child.args[1].value)
+                else:
+                    unknown = True
+
+            # another function of the module, called with the state
+            elif function.id in self.functions:
+                understood_uses += passed_state
+                callee_parameters = list(inspect.signature(self.functions[function.id]).parameters)
+                arguments = dict(zip(callee_parameters, child.args))
+                arguments.update({keyword.arg: keyword.value for keyword in child.keywords if keyword.arg})
+                calls.append((function.id, {parameter: item_argument(argument) for parameter, argument in arguments.items()}))
+
+        if understood_uses < state_uses:
+            unknown = True
+        if any(isinstance(child, ast.Return) and isinstance(child.value, (ast.JoinedStr, ast.Constant)) and isinstance(getattr(child.value, "value", ""), str)
+               for child in ast.walk(node)):
+            unknown = True
+
+        return FunctionDependencies(frozenset(items), frozenset(categories), frozenset(item_parameters), tuple(calls), unknown)
+
+    def resolve(self, func_name: str, resolving: tuple = ()) -> Optional[tuple[frozenset, frozenset]]:
+        """Returns the items the function depends on, following the functions it calls,
+        and its parameters that are item names. None means it depends on everything."""
+        if func_name in self.resolved:
+            return self.resolved[func_name]
+        # a function that calls itself back can't be followed, so it depends on everything
+        if func_name in resolving or func_name not in self.functions:
+            return None
+        resolving = resolving + (func_name,)
+
+        declared = getattr(self.functions[func_name], "declared_dependencies", None)
+        if declared is not None:
+            declared_items, declared_categories, declared_functions = declared
+            if callable(declared_items):
+                declared_items = frozenset(declared_items())
+            analyzed = FunctionDependencies(declared_items, declared_categories, frozenset(),
+                                            tuple((function, {}) for function in declared_functions), False)
+        else:
+            analyzed = self.analyzed.get(func_name)
+
+        result = None
+        if analyzed is not None and not analyzed.unknown:
+            items = set(analyzed.items)
+            parameters = set(analyzed.parameters)
+            for category in analyzed.categories:
+                items.update(self.category_items.get(category, []))
+
+            for callee, arguments in analyzed.calls:
+                callee_dependencies = self.resolve(callee, resolving)
+                if callee_dependencies is None:
+                    break
+                callee_items, callee_parameters = callee_dependencies
+                items.update(callee_items)
+                # the item parameters of the callee become what the caller passed for them
+                if any(arguments.get(parameter) is None for parameter in callee_parameters):
+                    break
+                for parameter in callee_parameters:
+                    argument = arguments[parameter]
+                    if argument.item is not None:
+                        items.add(argument.item)
+                    else:
+                        parameters.add(argument.parameter)
+            else:
+                result = (frozenset(items), frozenset(parameters))
+
+        self.resolved[func_name] = result
+        return result
+
+    def of_call(self, func_name: str, arguments: dict[str, Any]) -> Optional[frozenset]:
+        """Returns the items a call to the function depends on, given the values of its parameters. None means everything."""
+        dependencies = self.resolve(func_name)
+        if dependencies is None:
+            return None
+
+        items, parameters = dependencies
+        if not parameters:
+            return items
+        if not all(isinstance(arguments.get(parameter), str) for parameter in parameters):
+            return None
+        return items.union(arguments[parameter] for parameter in parameters)
+
+    def set_memo_groups(self):
+        """Puts the results of every @state_memoized function in the memo group of the items it depends on."""
+        for name, func in self.functions.items():
+            if getattr(func, "state_memoized", False):
+                func.dependency_group = get_dependency_group(self.of_call(name, {}))
@@ -0,0 +1,112 @@
+from typing import Any, Callable
+from time import perf_counter
+
+from .Helpers import get_state_memo
+from .RuleCompiler import AreaRule, SharedRequirement
+
+from BaseClasses import CollectionState
+
+import functools
+import os
+
+######################
+# Rule profiling
+#
+# Opt-in instrumentation of the compiled rules, enabled by setting the POKECLICKER_PROFILE_RULES environment variable
+# (to anything but 0) before generating. Every {function()} called from a requires and every location/entrance rule
+# records its calls, its total and max wall time (including what it calls) and how often its result came from the state's memo.
+# The summary is logged and written to the spoiler at the end of generation.
+######################
+
+PROFILE_RULES_VARIABLE = "POKECLICKER_PROFILE_RULES"
+
+
+def is_rule_profiling_enabled() -> bool:
+    return os.environ.get(PROFILE_RULES_VARIABLE, "0").strip() not in ("", "0")
+
+
+def get_memo_size(state: CollectionState, player: int, group: int) -> int:
+    """Returns how many results are memoized in the group, without creating it."""
+    return len(get_state_memo(state, player, group))
+
+
+class RuleStats:
+    """The timings of a single function or rule."""
+    __slots__ = ("calls", "hits", "total", "max", "cached")
+
+    def __init__(self, cached: bool):
+        self.calls = 0
+        self.hits = 0
+        self.total = 0.0
+        self.max = 0.0
+        # only memoized functions and shared requirements can be served from the memo
+        self.cached = cached
+
+    def record(self, elapsed: float, hit: bool):
+        self.calls += 1
+        self.hits += hit
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    def format(self, name: str) -> str:
+        hit_rate = f"{self.hits / self.calls:6.1%}" if self.cached and self.calls else "     -"
+        mean = self.total / self.calls if self.calls else 0.0
+        return f"{self.calls:>10}  {self.total * 1000:>10.2f} ms  {mean * 1e6:>9.2f} us  {self.max * 1e6:>10.2f} us  {hit_rate}  {name}"
+
+
+class RuleProfiler:
+    """Wraps the functions and rules of a single world while its rules are set, and keeps their timings."""
+    def __init__(self, player: int):
+        self.player = player
+        self.functions: dict[str, RuleStats] = {}
+        self.rules: dict[str, RuleStats] = {}
+
+    def wrap_function(self, func_name: str, call: Callable[[CollectionState], Any]) -> Callable[[CollectionState], Any]:
+        """Returns the bound call of a {function()} timed under the function's name."""
+        memoizable = getattr(call, "memoizable", False)
+        group = getattr(call, "memo_group", None)
+        stats = self.functions.setdefault(func_name, RuleStats(memoizable))
+        player = self.player
+
+        @functools.wraps(call)
+        def profiledCall(state: CollectionState):
+            # a memoized function only adds to its memo group when its result wasn't there yet,
+            # the group is measured outside of the timing so checking it doesn't count as time spent in the function
+            memo_size = get_memo_size(state, player, group) if memoizable else 0
+            start = perf_counter()
+            result = call(state)
+            elapsed = perf_counter() - start
+            stats.record(elapsed, memoizable and get_memo_size(state, player, group) == memo_size)
+            return result
+
+        return profiledCall
+
+    def wrap_rule(self, rule: AreaRule) -> Callable[[CollectionState], bool]:
+        """Returns the access rule of a location or an entrance timed under its name."""
+        requirement = rule.requirement
+        shared = isinstance(requirement, SharedRequirement)
+        stats = self.rules.setdefault(rule.name, RuleStats(shared))
+        player = self.player
+
+        def profiledRule(state: CollectionState) -> bool:
+            # get_state_memo doesn't create the group, so profiling doesn't change what the memo holds
+            hit = shared and requirement in get_state_memo(state, player, requirement.group)
+            start = perf_counter()
+            result = rule(state)
+            stats.record(perf_counter() - start, hit)
+            return result
+
+        return profiledRule
+
+    def summary(self, player_name: str, rule_limit: int = 25) -> str:
+        header = f"{'calls':>10}  {'total':>13}  {'mean':>12}  {'max':>13}  {'memo':>6}  name"
+        lines = [f"Rule profile ({player_name}):", "", f"{{function()}} calls, slowest first:", header]
+        for name, stats in sorted(self.functions.items(), key=lambda entry: entry[1].total, reverse=True):
+            lines.append(stats.format(name))
+
+        lines += ["", f"Location and entrance rules, {rule_limit} slowest of {len(self.rules)}:", header]
+        for name, stats in sorted(self.rules.items(), key=lambda entry: entry[1].total, reverse=True)[:rule_limit]:
+            lines.append(stats.format(name))
+
+        return "\n".join(lines)
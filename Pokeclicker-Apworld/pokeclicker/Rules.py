@@ -1,8 +1,11 @@
-from typing import TYPE_CHECKING, Optional
-from enum import IntEnum
+from typing import TYPE_CHECKING, Any, Callable, Optional
 from operator import eq, ge, le
 
-from .Regions import regionMap
+from .Regions import get_region_map
+from .RuleCompiler import RequiresCompiler, RequireFunctionError, AreaRule, ALWAYS_TRUE, all_of
+from .RuleProfiler import RuleProfiler, is_rule_profiling_enabled
+from .RuleDependencies import RuleDependencies
+from .Items import item_name_groups
 from .hooks import Rules
 from .Helpers import clamp, is_item_enabled, is_option_enabled, get_option_value, convert_string_to_type,\
     format_to_valid_identifier, format_state_prog_items_key, ProgItemsCat
@@ -13,295 +16,188 @@ from worlds.generic.Rules import set_rule, add_rule
 from Options import Choice, Toggle, Range, NamedRange
 
 import re
-import math
 import inspect
+import functools
 import logging
 
 if TYPE_CHECKING:
     from . import ManualWorld
 
-class LogicErrorSource(IntEnum):
-    INFIX_TO_POSTFIX = 1 # includes more closing parentheses than opening (but not the opposite)
-    EVALUATE_POSTFIX = 2 # includes missing pipes and missing value on either side of AND/OR
-    EVALUATE_STACK_SIZE = 3 # includes missing curly brackets
-
-def construct_logic_error(location_or_region: dict, source: LogicErrorSource) -> KeyError:
-    object_type = "location/region"
-    object_name = location_or_region.get("name", "Unknown")
-
-    if location_or_region.get("is_region", False) or "starting" in location_or_region or "connects_to" in location_or_region:
-        object_type = "region"
-    elif "region" in location_or_region or "category" in location_or_region:
-        object_type = "location"
-
-    if source == LogicErrorSource.INFIX_TO_POSTFIX:
-        source_text = "There may be mismatched parentheses, or other invalid syntax for the requires."
-    elif source == LogicErrorSource.EVALUATE_POSTFIX:
-        source_text = "There may be missing || around item names, or an AND/OR that is missing a value on one side, or other invalid syntax for the requires."
-    elif source == LogicErrorSource.EVALUATE_STACK_SIZE:
-        source_text = "There may be missing {} around requirement functions like YamlEnabled() / YamlDisabled(), or other invalid syntax for the requires."
-    else:
-        source_text = "This requires includes invalid syntax."
-
-    return KeyError(f"Invalid 'requires' for {object_type} '{object_name}': {source_text} (ERROR {source})")
-
-def infix_to_postfix(expr, location):
-    prec = {"&": 2, "|": 2, "!": 3}
-    stack = []
-    postfix = ""
-
-    try:
-        for c in expr:
-            if c.isnumeric():
-                postfix += c
-            elif c in prec:
-                while stack and stack[-1] != "(" and prec[c] <= prec[stack[-1]]:
-                    postfix += stack.pop()
-                stack.append(c)
-            elif c == "(":
-                stack.append(c)
-            elif c == ")":
-                while stack and stack[-1] != "(":
-                    postfix += stack.pop()
-                stack.pop()
-
-        while stack:
-            postfix += stack.pop()
-    except Exception:
-        raise construct_logic_error(location, LogicErrorSource.INFIX_TO_POSTFIX)
-
-    return postfix
-
-
-def evaluate_postfix(expr: str, location: str) -> bool:
-    stack = []
-
-    try:
-        for c in expr:
-            if c == "0":
-                stack.append(False)
-            elif c == "1":
-                stack.append(True)
-            elif c == "&":
-                op2 = stack.pop()
-                op1 = stack.pop()
-                stack.append(op1 and op2)
-            elif c == "|":
-                op2 = stack.pop()
-                op1 = stack.pop()
-                stack.append(op1 or op2)
-            elif c == "!":
-                op = stack.pop()
-                stack.append(not op)
-    except Exception:
-        raise construct_logic_error(location, LogicErrorSource.EVALUATE_POSTFIX)
-
-    if len(stack) != 1:
-        raise construct_logic_error(location, LogicErrorSource.EVALUATE_STACK_SIZE)
-
-    return stack.pop()
+@functools.cache
+def get_rule_dependencies() -> RuleDependencies:
+    """Returns the items every function of hooks/Rules.py depends on, found the first time rules are set so the memoized results
+    are only dropped when those items change (until then, every memoized result is dropped when any item changes)"""
+    rule_dependencies = RuleDependencies(Rules, item_name_groups)
+    rule_dependencies.set_memo_groups()
+    return rule_dependencies
 
 def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
-    # this is only called when the area (think, location or region) has a "requires" field that is a string
-    def checkRequireStringForArea(state: CollectionState, area: dict):
-        requires_list = area["requires"]
+    regionMap = get_region_map()
+    rule_dependencies = get_rule_dependencies()
 
-        # Get the "real" item counts of item in the pool/placed/starting_items
-        items_counts = world.get_item_counts(player, only_progression=True)
+    # when the rules are profiled, the functions and rules are timed through wrappers, otherwise they are used as they are
+    profiler = world.rule_profiler = RuleProfiler(player) if is_rule_profiling_enabled() else None
+    def profiledRule(rule: AreaRule):
+        return profiler.wrap_rule(rule) if profiler else rule
 
-        # Preparing some variables for exception messages
-        area_type = "region" if area.get("is_region",False) else "location"
-        area_name = area.get("name", f"unknown with these parameters: {area}")
-
-        if requires_list == "":
-            return True
+    # converts the args of a function call in place, and returns where the state needs to be inserted when it's called
+    def convert_req_function_args(func, args: list, areaName: str) -> list[int]:
+        parameters = inspect.signature(func).parameters
+        knownParameters = [World, 'ManualWorld', MultiWorld, CollectionState]
+        state_indexes = []
+        index = -1
+        for parameter in parameters.values():
+            target_type = parameter.annotation
+            index += 1
+            if target_type in knownParameters:
+                if target_type in [World, 'ManualWorld']:
+                    args.insert(index, world)
+                elif target_type == MultiWorld:
+                    args.insert(index, multiworld)
+                elif target_type == CollectionState:
+                    args.insert(index, None)
+                    state_indexes.append(index)
+                continue
+            if parameter.name.lower() == "player":
+                args.insert(index, player)
+                continue
 
-        def findAndRecursivelyExecuteFunctions(requires_list: str, recursionDepth: int = 0) -> str:
-            found_functions = re.findall(r'\{(\w+)\((.*?)\)\}', requires_list)
-            if found_functions:
-                if recursionDepth > world.rules_functions_maximum_recursion:
-                    raise RecursionError(f'One or more functions in {area_type} "{area_name}"\'s requires looped too many time (maximum recursion is {world.rules_functions_maximum_recursion}) \
-                                         \n    As of this Exception the following function(s) are waiting to run: {[f[0] for f in found_functions]} \
-                                         \n    And the currently processed requires look like this: "{requires_list}"')
-                else:
-                    for item in found_functions:
-                        func_name = item[0]
-                        func_args = item[1].split(",")
-                        if func_args == ['']:
-                            func_args.pop()
-
-                        func = globals().get(func_name)
-
-                        if func is None:
-                            func = getattr(Rules, func_name, None)
-
-                        if not callable(func):
-                            raise ValueError(f'Invalid function "{func_name}" in {area_type} "{area_name}".')
-
-                        convert_req_function_args(state, func, func_args, area_name)
-                        try:
-                            result = func(*func_args)
-                        except Exception as ex:
-                            raise RuntimeError(f'A call to the function "{func_name}" in {area_type} "{area_name}"\'s requires raised an Exception. \
-                                                \nUnless it was called by another function, it should look something like "{{{func_name}({item[1]})}}" in {area_type}s.json. \
-                                                \nFull error message: \
-                                                \n\n{type(ex).__name__}: {ex}')
-                        if isinstance(result, bool):
-                            requires_list = requires_list.replace("{" + func_name + "(" + item[1] + ")}", "1" if result else "0")
-                        else:
-                            requires_list = requires_list.replace("{" + func_name + "(" + item[1] + ")}", str(result))
-
-                requires_list = findAndRecursivelyExecuteFunctions(requires_list, recursionDepth + 1)
-            return requires_list
-
-        requires_list = findAndRecursivelyExecuteFunctions(requires_list)
-
-        # parse user written statement into list of each item
-        for item in re.findall(r'\|[^|]+\|', requires_list):
-            require_type = 'item'
-
-            if '|@' in item:
-                require_type = 'category'
-
-            item_base = item
-            item = item.lstrip('|@$').rstrip('|')
-
-            item_parts = item.split(":")  # type: list[str]
-            item_name = item
-            item_count = "1"
-
-
-            if len(item_parts) > 1:
-                item_name = item_parts[0].strip()
-                item_count = item_parts[1].strip()
-
-            total = 0
-
-            if require_type == 'category':
-                category_items = [item for item in world.item_name_to_item.values() if "category" in item and item_name in item["category"]]
-                category_items_counts = sum([items_counts.get(category_item["name"], 0) for category_item in category_items])
-                if item_count.lower() == 'all':
-                    item_count = category_items_counts
-                elif item_count.lower() == 'half':
-                    item_count = int(category_items_counts / 2)
-                elif item_count.endswith('%') and len(item_count) > 1:
-                    percent = clamp(float(item_count[:-1]) / 100, 0, 1)
-                    item_count = math.ceil(category_items_counts * percent)
-                else:
-                    try:
-                        item_count = int(item_count)
-                    except ValueError as e:
-                        raise ValueError(f"Invalid item count `{item_name}` in {area}.") from e
-
-                for category_item in category_items:
-                    total += state.count(category_item["name"], player)
-
-                    if total >= item_count:
-                        requires_list = requires_list.replace(item_base, "1")
-            elif require_type == 'item':
-                item_current_count = items_counts.get(item_name, 0)
-                if item_count.lower() == 'all':
-                    item_count = item_current_count
-                elif item_count.lower() == 'half':
-                    item_count = int(item_current_count / 2)
-                elif item_count.endswith('%') and len(item_count) > 1:
-                    percent = clamp(float(item_count[:-1]) / 100, 0, 1)
-                    item_count = math.ceil(item_current_count * percent)
+            if index < len(args) and args[index] != "":
+                value = args[index].strip()
+            else:
+                if parameter.default is not inspect.Parameter.empty:
+                    if index < len(args):
+                        args[index] = parameter.default
+                    else:
+                        args.insert(index, parameter.default)
+                    continue
                 else:
-                    item_count = int(item_count)
-
-                total = state.count(item_name, player)
-
-                if total >= item_count:
-                    requires_list = requires_list.replace(item_base, "1")
-
-            if total <= item_count:
-                requires_list = requires_list.replace(item_base, "0")
-
-        requires_list = re.sub(r'\s?\bAND\b\s?', '&', requires_list, 0, re.IGNORECASE)
-        requires_list = re.sub(r'\s?\bOR\b\s?', '|', requires_list, 0, re.IGNORECASE)
-
-        requires_string = infix_to_postfix("".join(requires_list), area)
-        return (evaluate_postfix(requires_string, area))
+                    if parameter.annotation is inspect.Parameter.empty:
+                        raise Exception(f"A call of the \"{func.__name__}\" function in \"{areaName}\"'s requirement, asks for a value for its argument \"{parameter.name}\" but it's missing.")
+                    else:
+                        raise Exception(f"A call of the \"{func.__name__}\" function in \"{areaName}\"'s requirement, asks for a value of type {target_type} for its argument \"{parameter.name}\" but it's missing.")
 
-    # this is only called when the area (think, location or region) has a "requires" field that is a dict
-    def checkRequireDictForArea(state: CollectionState, area: dict):
-        canAccess = True
+            if target_type == str or parameter.annotation is inspect.Parameter.empty: #Don't convert since its already a string or if we don't know the type to convert to
+                args[index] = value
+                continue
 
-        for item in area["requires"]:
-            # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
-            if (isinstance(item, dict) and "or" in item and isinstance(item["or"], list)) or (isinstance(item, list)):
-                canAccessOr = True
-                or_items = item
+            try:
+                value = convert_string_to_type(value, target_type)
 
-                if isinstance(item, dict):
-                    or_items = item["or"]
+            except Exception as e:
+                raise Exception(f"A call of the \"{func.__name__}\" function in \"{areaName}\"'s requirement, asks for a value of type {target_type}\nfor its argument \"{parameter.name}\" but its value \"{value}\" cannot be converted to {target_type} \nOriginal Error:'{e}'")
 
-                for or_item in or_items:
-                    or_item_parts = or_item.split(":")
-                    or_item_name = or_item
-                    or_item_count = 1
+            args[index] = value
 
-                    if len(or_item_parts) > 1:
-                        or_item_name = or_item_parts[0]
-                        or_item_count = int(or_item_parts[1])
+        return state_indexes
 
-                    if not state.has(or_item_name, player, or_item_count):
-                        canAccessOr = False
 
-                if canAccessOr:
-                    canAccess = True
-                    break
-            else:
-                item_parts = item.split(":")
-                item_name = item
-                item_count = 1
+    # resolves a {function(args)} found in a requires once, into a call that only needs the state for the compiled requires to use
+    def bindRequireFunction(func_name: str, func_args_text: str, area: dict) -> Callable[[CollectionState], Any]:
+        # Preparing some variables for exception messages
+        area_type = "region" if area.get("is_region",False) else "location"
+        area_name = area.get("name", f"unknown with these parameters: {area}")
 
-                if len(item_parts) > 1:
-                    item_name = item_parts[0]
-                    item_count = int(item_parts[1])
+        func_args = func_args_text.split(",")
+        if func_args == ['']:
+            func_args.pop()
+
+        func = globals().get(func_name)
+
+        if func is None:
+            func = getattr(Rules, func_name, None)
+
+        if not callable(func):
+            raise ValueError(f'Invalid function "{func_name}" in {area_type} "{area_name}".')
+
+        state_indexes = convert_req_function_args(func, func_args, area_name)
+
+        # the call is shared by every requires using it, the location or region is named by the rule that checked it
+        def raiseFunctionError(ex: Exception):
+            raise RequireFunctionError(func_name, func_args_text, ex)
+
+        if len(state_indexes) == 1: # the usual (world, state, player, ...) signature
+            args_before = tuple(func_args[:state_indexes[0]])
+            args_after = tuple(func_args[state_indexes[0] + 1:])
+
+            def callRequireFunction(state: CollectionState):
+                try:
+                    return func(*args_before, state, *args_after)
+                except Exception as ex:
+                    raiseFunctionError(ex)
+        else:
+            def callRequireFunction(state: CollectionState):
+                args = func_args.copy()
+                for index in state_indexes:
+                    args[index] = state
+                try:
+                    return func(*args)
+                except Exception as ex:
+                    raiseFunctionError(ex)
+
+        callRequireFunction.memoizable = getattr(func, "state_memoized", False)
+        callRequireFunction.memo_group = getattr(func, "dependency_group", None)
+        callRequireFunction.dependencies = None
+        if getattr(Rules, func_name, None) is func:
+            callRequireFunction.dependencies = rule_dependencies.of_call(func_name, dict(zip(inspect.signature(func).parameters, func_args)))
+
+        # functions that don't depend on the state are run once here, and the compiler folds what they return into the requires
+        fold = getattr(func, "fold", None)
+        if fold is None and not state_indexes:
+            fold = func
+        if fold is not None:
+            fold_args = func_args.copy()
+            for index in state_indexes:
+                fold_args[index] = None
+            try:
+                folded = fold(*fold_args)
+            except Exception as ex:
+                raise RequireFunctionError(func_name, func_args_text, ex, area_type, area_name)
+            if folded is not None:
+                callRequireFunction.folded = folded
 
-                if not state.has(item_name, player, item_count):
-                    canAccess = False
+        if profiler and not hasattr(callRequireFunction, "folded"):
+            return profiler.wrap_function(func_name, callRequireFunction)
+        return callRequireFunction
 
-        return canAccess
+    compiler = RequiresCompiler(world, player, bindRequireFunction)
 
-    # handle any type of checking needed, then ferry the check off to a dedicated method for that check
-    def fullLocationOrRegionCheck(state: CollectionState, area: dict):
+    # requires (in both the string and the list forms) are compiled once while the rules are set, then only the compiled form runs during access checks
+    def compileRequiresForArea(area: Optional[dict]):
         # if it's not a usable object of some sort, default to true
         if not area:
-            return True
+            return ALWAYS_TRUE
 
         # don't require the "requires" key for locations and regions if they don't need to use it
         if "requires" not in area.keys():
-            return True
+            return ALWAYS_TRUE
+
+        return compiler.compile(area["requires"], area)
 
-        if isinstance(area["requires"], str):
-            return checkRequireStringForArea(state, area)
-        else:  # item access is in dict form
-            return checkRequireDictForArea(state, area)
+    region_requirements = {}
+    def getRegionRequirement(region_name: str):
+        if region_name not in region_requirements:
+            region_requirements[region_name] = compileRequiresForArea({**regionMap[region_name], "name": region_name, "is_region": True})
+        return region_requirements[region_name]
 
     used_location_names = []
     # Region access rules
     for region in regionMap.keys():
         used_location_names.extend([l.name for l in multiworld.get_region(region, player).locations])
         if region != "Menu":
+            region_requirement = getRegionRequirement(region)
             for exitRegion in multiworld.get_region(region, player).entrances:
-                def fullRegionCheck(state: CollectionState, region=regionMap[region], region_name=exitRegion.name):
-                    region['name'] = region_name
-                    region['is_region'] = True
-
-                    return fullLocationOrRegionCheck(state, region)
-
-                add_rule(world.get_entrance(exitRegion.name), fullRegionCheck)
+                add_rule(world.get_entrance(exitRegion.name), profiledRule(AreaRule(exitRegion.name, region_requirement, "region", region)))
             entrance_rules = regionMap[region].get("entrance_requires", {})
             for e in entrance_rules:
                 entrance = world.get_entrance(f'{e}To{region}')
-                add_rule(entrance, lambda state, rule={"requires": entrance_rules[e]}: fullLocationOrRegionCheck(state, rule))
+                requirement = compileRequiresForArea({"name": entrance.name, "is_region": True, "requires": entrance_rules[e]})
+                add_rule(entrance, profiledRule(AreaRule(entrance.name, requirement, "region")))
             exit_rules = regionMap[region].get("exit_requires", {})
             for e in exit_rules:
                 exit = world.get_entrance(f'{region}To{e}')
-                add_rule(exit, lambda state, rule={"requires": exit_rules[e]}: fullLocationOrRegionCheck(state, rule))
+                requirement = compileRequiresForArea({"name": exit.name, "is_region": True, "requires": exit_rules[e]})
+                add_rule(exit, profiledRule(AreaRule(exit.name, requirement, "region")))
 
     # Location access rules
     for location in world.location_table:
@@ -310,83 +206,21 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
 
         locFromWorld = multiworld.get_location(location["name"], player)
 
-        locationRegion = regionMap[location["region"]] if "region" in location else None
-
-        if locationRegion:
-            locationRegion['name'] = location['region']
-            locationRegion['is_region'] = True
-
         if "requires" in location: # Location has requires, check them alongside the region requires
-            def checkBothLocationAndRegion(state: CollectionState, location=location, region=locationRegion):
-                locationCheck = fullLocationOrRegionCheck(state, location)
-                regionCheck = True # default to true unless there's a region with requires
-
-                if region:
-                    regionCheck = fullLocationOrRegionCheck(state, region)
+            requirement = compileRequiresForArea(location)
 
-                return locationCheck and regionCheck
-
-            set_rule(locFromWorld, checkBothLocationAndRegion)
-        elif "region" in location: # Only region access required, check the location's region's requires
-            def fullRegionCheck(state, region=locationRegion):
-                return fullLocationOrRegionCheck(state, region)
-
-            set_rule(locFromWorld, fullRegionCheck)
+            if "region" in location and world.location_rules_check_region:
+                requirement = all_of(requirement, getRegionRequirement(location["region"]))
+        elif "region" in location and world.location_rules_check_region: # Only region access required, check the location's region's requires
+            requirement = getRegionRequirement(location["region"])
         else: # No location region and no location requires? It's accessible.
-            def allRegionsAccessible(state):
-                return True
+            requirement = ALWAYS_TRUE
 
-            set_rule(locFromWorld, allRegionsAccessible)
+        set_rule(locFromWorld, profiledRule(AreaRule(location["name"], requirement)))
 
     # Victory requirement
     multiworld.completion_condition[player] = lambda state: state.has("__Victory__", player)
 
-    def convert_req_function_args(state: CollectionState, func, args: list[str], areaName: str):
-        parameters = inspect.signature(func).parameters
-        knownParameters = [World, 'ManualWorld', MultiWorld, CollectionState]
-        index = -1
-        for parameter in parameters.values():
-            target_type = parameter.annotation
-            index += 1
-            if target_type in knownParameters:
-                if target_type in [World, 'ManualWorld']:
-                    args.insert(index, world)
-                elif target_type == MultiWorld:
-                    args.insert(index, multiworld)
-                elif target_type == CollectionState:
-                    args.insert(index, state)
-                continue
-            if parameter.name.lower() == "player":
-                args.insert(index, player)
-                continue
-
-            if index < len(args) and args[index] != "":
-                value = args[index].strip()
-            else:
-                if parameter.default is not inspect.Parameter.empty:
-                    if index < len(args):
-                        args[index] = parameter.default
-                    else:
-                        args.insert(index, parameter.default)
-                    continue
-                else:
-                    if parameter.annotation is inspect.Parameter.empty:
-                        raise Exception(f"A call of the \"{func.__name__}\" function in \"{areaName}\"'s requirement, asks for a value for its argument \"{parameter.name}\" but it's missing.")
-                    else:
-                        raise Exception(f"A call of the \"{func.__name__}\" function in \"{areaName}\"'s requirement, asks for a value of type {target_type} for its argument \"{parameter.name}\" but it's missing.")
-
-            if target_type == str or parameter.annotation is inspect.Parameter.empty: #Don't convert since its already a string or if we don't know the type to convert to
-                args[index] = value
-                continue
-
-            try:
-                value = convert_string_to_type(value, target_type)
-
-            except Exception as e:
-                raise Exception(f"A call of the \"{func.__name__}\" function in \"{areaName}\"'s requirement, asks for a value of type {target_type}\nfor its argument \"{parameter.name}\" but its value \"{value}\" cannot be converted to {target_type} \nOriginal Error:'{e}'")
-
-            args[index] = value
-
 
 def ItemValue(state: CollectionState, player: int, valueCount: str):
     """When passed a string with this format: 'valueName:int',
@@ -9,18 +9,20 @@ import Utils
 from worlds.generic.Rules import forbid_items_for_player
 from worlds.LauncherComponents import Component, SuffixIdentifier, components, Type, launch_subprocess, icon_paths
 
-from .Data import item_table, location_table, region_table, category_table
+from .Data import item_table, location_table, category_table
 from .Game import game_name, filler_item_name, starting_items
 from .Meta import world_description, world_webworld, enable_region_diagram
 from .Locations import location_id_to_name, location_name_to_id, location_name_to_location, location_name_groups, victory_names
-from .Items import item_id_to_name, item_name_to_id, item_name_to_item, item_name_groups
+from .Items import item_id_to_name, item_name_to_id, item_name_to_item, item_name_groups, is_category_group
 from .DataValidation import runGenerationDataValidation, runPreFillDataValidation
 
 from .Regions import create_regions
 from .Items import ManualItem
 from .Rules import set_rules
+from .RuleProfiler import RuleProfiler
 from .Options import manual_options_data
-from .Helpers import is_item_enabled, get_option_value, get_items_for_player, resolve_yaml_option, format_state_prog_items_key, ProgItemsCat
+from .Helpers import is_item_enabled, get_option_value, get_items_for_player, resolve_yaml_option, format_state_prog_items_key, ProgItemsCat, \
+    bump_state_version, get_category_count_key
 
 from BaseClasses import CollectionState, ItemClassification, Item
 from Options import PerGameCommonOptions
@@ -61,6 +63,7 @@ class Pokeclicker(World):
 
     item_counts: dict[int, Counter[str]] = {}
     item_counts_progression: dict[int, Counter[str]] = {}
+    category_counts_progression: dict[int, Counter[str]] = {}
     start_inventory = {}
 
     location_id_to_name = location_id_to_name
@@ -244,6 +247,7 @@ class Pokeclicker(World):
         real_pool = pool + items_started
         self.item_counts[self.player] = self.get_item_counts(pool=real_pool)
         self.item_counts_progression[self.player] = self.get_item_counts(pool=real_pool, only_progression=True)
+        self.category_counts_progression[self.player] = self.get_category_counts(item_counts=self.item_counts_progression[self.player])
 
     def create_item(self, name: str, class_override: Optional['ItemClassification']=None) -> Item:
         name = before_create_item(name, self, self.multiworld, self.player)
@@ -276,6 +280,10 @@ class Pokeclicker(World):
     def collect(self, state: CollectionState, item: Item) -> bool:
         change = super().collect(state, item)
         manual_item = self.item_name_to_item.get(item.name, {})
+        if change:
+            bump_state_version(state, item.player, item.name)
+            for category in manual_item.get("category", []):
+                state.prog_items[item.player][get_category_count_key(category)] += 1
         if change and manual_item.get("value"):
             for key, value in manual_item["value"].items():
                 state.prog_items[item.player][format_state_prog_items_key(ProgItemsCat.VALUE, key)] += int(value)
@@ -285,6 +293,10 @@ class Pokeclicker(World):
     def remove(self, state: CollectionState, item: Item) -> bool:
         change = super().remove(state, item)
         manual_item = self.item_name_to_item.get(item.name, {})
+        if change:
+            bump_state_version(state, item.player, item.name)
+            for category in manual_item.get("category", []):
+                state.prog_items[item.player][get_category_count_key(category)] -= 1
         if change and manual_item.get("value"):
             for key, value in manual_item["value"].items():
                 state.prog_items[item.player][format_state_prog_items_key(ProgItemsCat.VALUE, key)] -= int(value)
@@ -394,6 +406,11 @@ class Pokeclicker(World):
     def write_spoiler(self, spoiler_handle):
         before_write_spoiler(self, self.multiworld, spoiler_handle)
 
+        if self.rule_profiler:
+            summary = self.rule_profiler.summary(self.multiworld.get_player_name(self.player))
+            logging.info(summary)
+            spoiler_handle.write(f"\n\n{summary}\n")
+
     def extend_hint_information(self, hint_data: dict[int, dict[int, str]]) -> None:
         before_extend_hint_information(hint_data, self, self.multiworld, self.player)
 
@@ -416,6 +433,16 @@ class Pokeclicker(World):
     The maximum time a location/region's requirement can loop to check for functions\n
     One thing to remember is the more you loop the longer generation will take. So probably leave it as is unless you really needs it."""
 
+    location_rules_check_region: bool = False
+    """Default: False\n
+    If True, the access rule of a location also checks the requires of its region.\n
+    Archipelago only lets a location be reached once its region is, and the region's requires are already on every entrance into it,
+    so this is only needed if something uses the locations' access rules without checking their region."""
+
+    rule_profiler: Optional[RuleProfiler] = None
+    """Set by set_rules when the POKECLICKER_PROFILE_RULES environment variable is set.\n
+    It keeps the timings of every {function()} and location/entrance rule, which are logged and written to the spoiler."""
+
     def add_filler_items(self, item_pool, traps):
         Utils.deprecate("Use adjust_filler_items instead.")
         return self.adjust_filler_items(item_pool, traps)
@@ -493,3 +520,16 @@ class Pokeclicker(World):
             return self.item_counts_progression.get(player, Counter())
         else:
             return self.item_counts.get(player, Counter())
+
+    def get_category_counts(self, player: Optional[int] = None, item_counts: Optional[Counter[str]] = None) -> Counter[str]:
+        """Returns how many progression items of each category are in the player's pool.\n
+        If you provide item counts using the item_counts argument, then the categories of those items will be counted instead.
+        Otherwise, this function will only work after create_items, before then an empty Counter is returned."""
+        if player is None:
+            player = self.player
+
+        if item_counts is None:
+            return self.category_counts_progression.get(player, Counter())
+
+        return Counter({category: sum(item_counts.get(item_name, 0) for item_name in item_names)
+                        for category, item_names in item_name_groups.items() if is_category_group(category)})
@@ -36,6 +36,10 @@ def after_load_option_file(option_table: dict) -> dict:
 def after_load_meta_file(meta_table: dict) -> dict:
     return meta_table
 
+# called after the map.json file has been loaded, before the map graph used by the rules is built from it
+def after_load_map_file(map_table: dict) -> dict:
+    return map_table
+
 # called when an external tool (eg Universal Tracker) ask for slot data to be read
 # use this if you want to restore more data
 # return True if you want to trigger a regeneration if you changed anything
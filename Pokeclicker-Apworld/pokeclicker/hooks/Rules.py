@@ -1,9 +1,14 @@
-from typing import Optional
+from typing import Iterable, Optional
 from worlds.AutoWorld import World
-from ..Helpers import clamp, get_items_with_value
+from ..Helpers import clamp, get_items_with_value, state_memoized, state_independent, folded_by, depends_on, format_state_prog_items_key, count_category, convert_string_to_type
+from .. import Data
+from ..Data import map_table
+from ..MapGraph import MapGraph, MapReach
+from ..AttackModel import party_attack, click_attack, clicks_per_second, expected_attack, expected_attacks_for_counts
+from ..RuleCompiler import FUNCTION_PATTERN
 from BaseClasses import MultiWorld, CollectionState
 
-import re
+import functools
 
 # Sometimes you have a requirement that is just too messy or repetitive to write out with boolean logic.
 # Define a function here, and you can use it in a requires string with {function_name()}.
@@ -29,305 +34,242 @@ def requiresMelee():
     return "|Figher Level:15| or |Black Belt Level:15| or |Thief Level:15|"
 
 
+# Functions decorated with @state_memoized only run once per state until the player collects or removes an item,
+# calling them again with the same arguments returns the cached result. Only use it on functions that depend on the items of the player.
+
+# The towns, routes, dungeons and the steps of Bill's Errand are nodes of data/map.json,
+# every node the player can get to is found in one pass per state, so the functions below only look up their node.
+kanto_map = MapGraph(map_table)
+
+@depends_on(items=kanto_map.item_names(), functions=["get_expected_attack"])
+@state_memoized
+def get_map_reach(world: World, state: CollectionState, player: int) -> MapReach:
+    """Returns every node of the map the player can get to."""
+    return kanto_map.explore(state, player, get_expected_attack(world, state, player),
+                             lambda script_name: has_script(world, state, player, script_name),
+                             lambda dungeon: get_dungeon_attack_needed(world, dungeon))
+
+def reached_map_node(world: World, state: CollectionState, player: int, node: str) -> bool:
+    """Checks if the player can get to the node of the map, completing it if it's a dungeon."""
+    return node in get_map_reach(world, state, player).reached
+
+def entered_map_node(world: World, state: CollectionState, player: int, node: str) -> bool:
+    """Checks if the gates of the node of the map are open, without checking the attack needed to complete it if it's a dungeon."""
+    return node in get_map_reach(world, state, player).entered
+
+@state_memoized
+def reached_any_map_node(world: World, state: CollectionState, player: int, nodes: tuple[str, ...]) -> bool:
+    """Checks if the player can get to any of the nodes, which should come from kanto_map.any_of() so the cheapest are checked first."""
+    reached = get_map_reach(world, state, player).reached
+    for node in nodes:
+        if node in reached:
+            return True
+    return False
+
+KANTO_ROUTES = kanto_map.any_of([f"Kanto Route {route}" for route in range(1, 26)])
+
 # Kanto
+@state_memoized
 def kanto_route_1(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 1."""
-    return True
+    return reached_map_node(world, state, player, "Kanto Route 1")
 
+@state_memoized
 def pallet_town(world: World, state: CollectionState, player: int):
     """Checks if the player can access Pallet Town."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Pallet Town", player) > 0
-    #     return has_location
-    has_town_map = state.count("Town Map", player) > 0
-    return kanto_route_1(world, state, player) and has_town_map
+    return reached_map_node(world, state, player, "Pallet Town")
 
+@state_memoized
 def kanto_route_22(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 22."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 22", player) > 0
-    #     return has_location
-    return kanto_route_1(world, state, player)
+    return reached_map_node(world, state, player, "Kanto Route 22")
 
+@state_memoized
 def kanto_route_2(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 2."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 2", player) > 0
-    #     return has_location
-    return kanto_route_1(world, state, player)
+    return reached_map_node(world, state, player, "Kanto Route 2")
 
+@state_memoized
 def viridian_city(world: World, state: CollectionState, player: int):
     """Checks if the player can access Viridian City."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Viridian City", player) > 0
-    #     return has_location
-    return kanto_route_1(world, state, player)
+    return reached_map_node(world, state, player, "Viridian City")
 
+@state_memoized
 def viridian_forest(world: World, state: CollectionState, player: int, complete_dungeon: bool = True, special_boss_attack: int = 0):
     """Checks if the player can access Viridian Forest."""
-    has_dungeon_ticket = state.count("Dungeon Ticket", player) > 0
-    minion_attack = 102
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Viridian Forest", player) > 0
-    #     return has_location and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
-    return kanto_route_2(world, state, player) and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
+    return entered_map_node(world, state, player, "Viridian Forest") and can_run_dungeon(world, state, player, "Viridian Forest", complete_dungeon, special_boss_attack)
 
+@state_memoized
 def pewter_city(world: World, state: CollectionState, player: int):
     """Checks if the player can access Pewter City."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Pewter City", player) > 0
-    #     return has_location
-    return viridian_forest(world, state, player)
+    return reached_map_node(world, state, player, "Pewter City")
 
+@state_memoized
 def kanto_route_3(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 3."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 3", player) > 0
-    #     return has_location
-    has_boulder_badge = state.count("Boulder Badge", player) > 0
-    return has_boulder_badge
+    return reached_map_node(world, state, player, "Kanto Route 3")
 
+@state_memoized
 def mt_moon(world: World, state: CollectionState, player: int, complete_dungeon: bool = True, special_boss_attack: int = 0):
     """Checks if the player can access Mt. Moon."""
-    has_dungeon_ticket = state.count("Dungeon Ticket", player) > 0
-    minion_attack = 834
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Mt. Moon", player) > 0
-    #     return has_location and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
-    return kanto_route_3(world, state, player) and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
+    return entered_map_node(world, state, player, "Mt. Moon") and can_run_dungeon(world, state, player, "Mt. Moon", complete_dungeon, special_boss_attack)
 
+@state_memoized
 def kanto_route_4_pokecenter(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 4 Pokecenter."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 4 Pokemon Center", player) > 0
-    #     return has_location
-    return kanto_route_3(world, state, player)
+    return reached_map_node(world, state, player, "Kanto Route 4 Pokemon Center")
 
+@state_memoized
 def kanto_route_4(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 4."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 4", player) > 0
-    #     return has_location
-    return mt_moon(world, state, player)
+    return reached_map_node(world, state, player, "Kanto Route 4")
 
+@state_memoized
 def cerulean_city(world: World, state: CollectionState, player: int):
     """Checks if the player can access Cerulean City."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Cerulean City", player) > 0
-    #     return has_location
-    return kanto_route_4(world, state, player)
+    return reached_map_node(world, state, player, "Cerulean City")
 
+@state_memoized
 def kanto_route_24(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 24."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 24", player) > 0
-    #     return has_location
-    return kanto_route_4(world, state, player) and attack_needed(world, state, player, 14041)
+    return reached_map_node(world, state, player, "Kanto Route 24")
 
+@state_memoized
 def kanto_route_25(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 25."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 25", player) > 0
-    #     return has_location
-    return kanto_route_24(world, state, player)
+    return reached_map_node(world, state, player, "Kanto Route 25")
 
+@state_memoized
 def bills_house(world: World, state: CollectionState, player: int):
     """Checks if the player can access Bill's House."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Bill's House", player) > 0
-    #     return has_location
-    return kanto_route_25(world, state, player)
+    return reached_map_node(world, state, player, "Bill's House")
 
+@state_memoized
 def kanto_route_5(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 5."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 5", player) > 0
-    #     return has_location
-    return kanto_route_25(world, state, player)
+    return reached_map_node(world, state, player, "Kanto Route 5")
 
+@state_memoized
 def kanto_route_6(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 6."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 6", player) > 0
-    #     return has_location
-    return kanto_route_5(world, state, player)
+    return reached_map_node(world, state, player, "Kanto Route 6")
 
+@state_memoized
 def vermilion_city(world: World, state: CollectionState, player: int):
     """Checks if the player can access Vermilion City."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Vermilion City", player) > 0
-    #     return has_location
-    return kanto_route_6(world, state, player)
+    return reached_map_node(world, state, player, "Vermilion City")
 
+@state_memoized
 def kanto_route_11(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 11."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 11", player) > 0
-    #     return has_location
-    return kanto_route_6(world, state, player)
+    return reached_map_node(world, state, player, "Kanto Route 11")
 
+@state_memoized
 def digletts_cave(world: World, state: CollectionState, player: int, complete_dungeon: bool = True, special_boss_attack: int = 0):
     """Checks if the player can access Diglett's Cave."""
-    has_dungeon_ticket = state.count("Dungeon Ticket", player) > 0
-    minion_attack = 2962
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Diglett's Cave", player) > 0
-    #     return has_location and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
-    return kanto_route_6(world, state, player) and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
+    return entered_map_node(world, state, player, "Diglett's Cave") and can_run_dungeon(world, state, player, "Diglett's Cave", complete_dungeon, special_boss_attack)
 
+@state_memoized
 def kanto_route_9(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 9."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 9", player) > 0
-    #     return has_location
-    has_cascade_badge = state.count("Cascade Badge", player) > 0
-    return vermilion_city(world, state, player) and attack_needed(world, state, player, 50431) and has_cascade_badge
+    return reached_map_node(world, state, player, "Kanto Route 9")
 
+@state_memoized
 def power_plant(world: World, state: CollectionState, player: int, complete_dungeon: bool = True, special_boss_attack: int = 0):
     """Checks if the player can access the Power Plant."""
-    has_dungeon_ticket = state.count("Dungeon Ticket", player) > 0
-    minion_attack = 13507
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Power Plant", player) > 0
-    #     return has_location and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
-    has_soul_badge = state.count("Soul Badge", player) > 0
-    return kanto_route_9(world, state, player) and has_soul_badge and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
+    return entered_map_node(world, state, player, "Power Plant") and can_run_dungeon(world, state, player, "Power Plant", complete_dungeon, special_boss_attack)
 
+@state_memoized
 def kanto_route_10(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 10."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 10", player) > 0
-    #     return has_location
-    return kanto_route_9(world, state, player)
+    return reached_map_node(world, state, player, "Kanto Route 10")
 
+@state_memoized
 def rock_tunnel(world: World, state: CollectionState, player: int, complete_dungeon: bool = True, special_boss_attack: int = 0):
     """Checks if the player can access Rock Tunnel."""
-    has_dungeon_ticket = state.count("Dungeon Ticket", player) > 0
-    minion_attack = 2048
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Rock Tunnel", player) > 0
-    #     return has_location and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
-    return kanto_route_10(world, state, player) and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
+    return entered_map_node(world, state, player, "Rock Tunnel") and can_run_dungeon(world, state, player, "Rock Tunnel", complete_dungeon, special_boss_attack)
 
+@state_memoized
 def lavender_town(world: World, state: CollectionState, player: int):
     """Checks if the player can access Lavender Town."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Lavender Town", player) > 0
-    #     return has_location
-    return rock_tunnel(world, state, player)
+    return reached_map_node(world, state, player, "Lavender Town")
 
+@state_memoized
 def pokemon_tower(world: World, state: CollectionState, player: int, complete_dungeon: bool = True, special_boss_attack: int = 0):
     """Checks if the player can access Pokemon Tower."""
-    has_dungeon_ticket = state.count("Dungeon Ticket", player) > 0
-    minion_attack = 7523
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Pokemon Tower", player) > 0
-    #     return has_location and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
-    return lavender_town(world, state, player) and rocket_game_corner(world, state, player) and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
+    return entered_map_node(world, state, player, "Pokemon Tower") and can_run_dungeon(world, state, player, "Pokemon Tower", complete_dungeon, special_boss_attack)
 
+@state_memoized
 def kanto_route_12(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 12."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 12", player) > 0
-    #     return has_location
-    return rock_tunnel(world, state, player)
+    return reached_map_node(world, state, player, "Kanto Route 12")
 
+@state_memoized
 def kanto_route_8(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 8."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 8", player) > 0
-    #     return has_location
-    return rock_tunnel(world, state, player)
+    return reached_map_node(world, state, player, "Kanto Route 8")
 
+@state_memoized
 def saffron_city(world: World, state: CollectionState, player: int):
     """Checks if the player can access Saffron City."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Saffron City", player) > 0
-    #     return has_location
-    has_rainbow_badge = state.count("Rainbow Badge", player) > 0
-    return celadon_city(world, state, player) or has_rainbow_badge
+    return reached_map_node(world, state, player, "Saffron City")
 
+@state_memoized
 def silph_co(world: World, state: CollectionState, player: int, complete_dungeon: bool = True, special_boss_attack: int = 0):
     """Checks if the player can access the Sylph Co. building."""
-    has_dungeon_ticket = state.count("Dungeon Ticket", player) > 0
-    minion_attack = 10515
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Silph Co.", player) > 0
-    #     return has_location and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
-    return saffron_city(world, state, player) and pokemon_tower(world, state, player) and attack_needed(world, state, player, 151990) and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
+    return entered_map_node(world, state, player, "Silph Co.") and can_run_dungeon(world, state, player, "Silph Co.", complete_dungeon, special_boss_attack)
 
+@state_memoized
 def kanto_route_7(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 7."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 7", player) > 0
-    #     return has_location
-    return kanto_route_8(world, state, player)
+    return reached_map_node(world, state, player, "Kanto Route 7")
 
+@state_memoized
 def celadon_city(world: World, state: CollectionState, player: int):
     """Checks if the player can access Celadon City."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Celadon City", player) > 0
-    #     return has_location
-    return kanto_route_7(world, state, player)
+    return reached_map_node(world, state, player, "Celadon City")
 
+@state_memoized
 def rocket_game_corner(world: World, state: CollectionState, player: int, complete_dungeon: bool = True, special_boss_attack: int = 0):
     """Checks if the player can access the Rocket Game Corner."""
-    has_dungeon_ticket = state.count("Dungeon Ticket", player) > 0
-    minion_attack = 5820
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Rocket Game Corner", player) > 0
-    #     return has_location and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
-    return celadon_city(world, state, player) and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
+    return entered_map_node(world, state, player, "Rocket Game Corner") and can_run_dungeon(world, state, player, "Rocket Game Corner", complete_dungeon, special_boss_attack)
 
+@state_memoized
 def kanto_route_13(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 13."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 13", player) > 0
-    #     return has_location
-    return pokemon_tower(world, state, player)
+    return reached_map_node(world, state, player, "Kanto Route 13")
 
+@state_memoized
 def kanto_route_14(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 14."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 14", player) > 0
-    #     return has_location
-    return kanto_route_13(world, state, player)
+    return reached_map_node(world, state, player, "Kanto Route 14")
 
+@state_memoized
 def kanto_route_15(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 15."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 15", player) > 0
-    #     return has_location
-    return kanto_route_14(world, state, player)
+    return reached_map_node(world, state, player, "Kanto Route 15")
 
+@state_memoized
 def kanto_route_16(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 16."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 16", player) > 0
-    #     return has_location
-    return pokemon_tower(world, state, player)
+    return reached_map_node(world, state, player, "Kanto Route 16")
 
+@state_memoized
 def kanto_route_17(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 17."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 17", player) > 0
-    #     return has_location
-    return kanto_route_16(world, state, player)
+    return reached_map_node(world, state, player, "Kanto Route 17")
 
+@state_memoized
 def kanto_route_18(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 18."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 18", player) > 0
-    #     return has_location
-    return kanto_route_17(world, state, player)
+    return reached_map_node(world, state, player, "Kanto Route 18")
 
-def fuchsia_city(world: World, state: CollectionState, player: int):   
+@state_memoized
+def fuchsia_city(world: World, state: CollectionState, player: int):
     """Checks if the player can access Fuchsia City."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Fuchsia City", player) > 0
-    #     return has_location
-    return kanto_route_15(world, state, player) or kanto_route_18(world, state, player)
+    return reached_map_node(world, state, player, "Fuchsia City")
 
+@state_memoized
 def safari_zone(world: World, state: CollectionState, player: int):
     """Checks if the player can access the Safari Zone."""
     has_safari_ticket = state.count("Safari Ticket", player) > 0
@@ -338,383 +280,384 @@ def safari_zone(world: World, state: CollectionState, player: int):
     else:
         return has_safari_ticket and completed_tutorial
 
+@state_memoized
 def kanto_route_19(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 19."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 19", player) > 0
-    #     return has_location
-    has_soul_badge = state.count("Soul Badge", player) > 0
-    return has_soul_badge
+    return reached_map_node(world, state, player, "Kanto Route 19")
 
+@state_memoized
 def seafoam_islands(world: World, state: CollectionState, player: int, complete_dungeon: bool = True, special_boss_attack: int = 0):
     """Checks if the player can access Seafoam Islands."""
-    had_dungeon_ticket = state.count("Dungeon Ticket", player) > 0
-    minion_attack = 17226
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Seafoam Islands", player) > 0
-    #     return has_location and had_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
-    has_rainbow_badge = state.count("Rainbow Badge", player) > 0
-    return kanto_route_19(world, state, player) and has_rainbow_badge and had_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
+    return entered_map_node(world, state, player, "Seafoam Islands") and can_run_dungeon(world, state, player, "Seafoam Islands", complete_dungeon, special_boss_attack)
 
+@state_memoized
 def kanto_route_20(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 20."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 20", player) > 0
-    #     return has_location
-    return kanto_route_21(world, state, player) or seafoam_islands(world, state, player)
+    return reached_map_node(world, state, player, "Kanto Route 20")
 
+@state_memoized
 def kanto_route_21(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 21."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 21", player) > 0
-    #     return has_location
-    has_soul_badge = state.count("Soul Badge", player) > 0
-    return has_soul_badge
+    return reached_map_node(world, state, player, "Kanto Route 21")
 
+@state_memoized
 def cinnabar_island(world: World, state: CollectionState, player: int):
     """Checks if the player can access Cinnabar Island."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Cinnabar Island", player) > 0
-    #     return has_location
-    return kanto_route_21(world, state, player)
+    return reached_map_node(world, state, player, "Cinnabar Island")
 
+@state_memoized
 def pokemon_mansion(world: World, state: CollectionState, player: int, complete_dungeon: bool = True, special_boss_attack: int = 0):
     """Checks if the player can access the Pokemon Mansion."""
-    has_dungeon_ticket = state.count("Dungeon Ticket", player) > 0
-    minion_attack = 17760
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Pokemon Mansion", player) > 0
-    #     return has_location and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
-    return cinnabar_island(world, state, player) and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
+    return entered_map_node(world, state, player, "Pokemon Mansion") and can_run_dungeon(world, state, player, "Pokemon Mansion", complete_dungeon, special_boss_attack)
 
+@state_memoized
 def kanto_route_23(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kanto Route 23."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kanto Route 23", player) > 0
-    #     return has_location
-    has_earth_badge = state.count("Earth Badge", player) > 0
-    return kanto_route_22(world, state, player) and has_earth_badge and attack_needed(world, state, player, 426771)
+    return reached_map_node(world, state, player, "Kanto Route 23")
 
+@state_memoized
 def victory_road(world: World, state: CollectionState, player: int, complete_dungeon: bool = True, special_boss_attack: int = 0):
     """Checks if the player can access Victory Road."""
-    has_dungeon_ticket = state.count("Dungeon Ticket", player) > 0
-    minion_attack = 24595
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Victory Road", player) > 0
-    #     return has_location
-    return kanto_route_23(world, state, player) and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
+    return entered_map_node(world, state, player, "Victory Road") and can_run_dungeon(world, state, player, "Victory Road", complete_dungeon, special_boss_attack)
 
+@state_memoized
 def indigo_plateau(world: World, state: CollectionState, player: int):
     """Checks if the player can access Indigo Plateau."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Indigo Plateau Kanto", player) > 0
-    #     return has_location
-    return victory_road(world, state, player)
+    return reached_map_node(world, state, player, "Indigo Plateau Kanto")
 
+@state_memoized
 def cerulean_cave(world: World, state: CollectionState, player: int, complete_dungeon: bool = True, special_boss_attack: int = 0):
     """Checks if the player can access Cerulean Cave."""
-    has_dungeon_ticket = state.count("Dungeon Ticket", player) > 0
-    minion_attack = 28735
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Cerulean Cave", player) > 0
-    #     return has_location and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
-    has_elite_champion_badge = state.count("Kanto Elite Champion Badge", player) > 0
-    return has_elite_champion_badge and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
+    return entered_map_node(world, state, player, "Cerulean Cave") and can_run_dungeon(world, state, player, "Cerulean Cave", complete_dungeon, special_boss_attack)
 
+@state_memoized
 def new_island(world: World, state: CollectionState, player: int, complete_dungeon: bool = True, special_boss_attack: int = 0):
     """Checks if the player can access New Island dungeon in Kanto."""
-    has_dungeon_ticket = state.count("Dungeon Ticket", player) > 0
-    has_infinite_seasonal_events = has_script(world, state, player, "Infinite Seasonal Events")
-    minion_attack = 18500
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("New Island", player) > 0
-    #     return has_location and has_dungeon_ticket and has_infinite_seasonal_events and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
-    return has_dungeon_ticket and has_infinite_seasonal_events and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
+    return entered_map_node(world, state, player, "New Island") and can_run_dungeon(world, state, player, "New Island", complete_dungeon, special_boss_attack)
 
 # Kanto - Sevii Islands 123
+@state_memoized
 def one_island(world: World, state: CollectionState, player: int):
     """Checks if the player can access Sevii One Island."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("One Island", player) > 0
-    #     return has_location
-    has_volcano_badge = state.count("Volcano Badge", player) > 0
-    return has_volcano_badge
+    return reached_map_node(world, state, player, "One Island")
 
+@state_memoized
 def treasure_beach(world: World, state: CollectionState, player: int):
     """Checks if the player can access Treasure Beach on Sevii One Island."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Treasure Beach", player) > 0
-    #     return has_location
-    has_volcano_badge = state.count("Volcano Badge", player) > 0
-    return has_volcano_badge
+    return reached_map_node(world, state, player, "Treasure Beach")
 
+@state_memoized
 def kindle_road(world: World, state: CollectionState, player: int):
     """Checks if the player can access Kindle Road on Sevii One Island."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Kindle Road", player) > 0
-    #     return has_location
-    has_volcano_badge = state.count("Volcano Badge", player) > 0
-    return has_volcano_badge
+    return reached_map_node(world, state, player, "Kindle Road")
 
+@state_memoized
 def mount_ember(world: World, state: CollectionState, player: int, complete_dungeon: bool = True, special_boss_attack: int = 0):
     """Checks if the player can access Mount Ember on Sevii One Island."""
-    has_dungeon_ticket = state.count("Dungeon Ticket", player) > 0
-    minion_attack = 18120
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Mt. Ember Summit", player) > 0
-    #     return has_location
-    return kindle_road(world, state, player) and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
+    return entered_map_node(world, state, player, "Mt. Ember") and can_run_dungeon(world, state, player, "Mt. Ember", complete_dungeon, special_boss_attack)
 
+@state_memoized
 def two_island(world: World, state: CollectionState, player: int):
     """Checks if the player can access Sevii Two Island."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Two Island", player) > 0
-    #     return has_location
-    return bills_errand1(world, state, player)
+    return reached_map_node(world, state, player, "Two Island")
 
+@state_memoized
 def cape_brink(world: World, state: CollectionState, player: int):
     """Checks if the player can access Sevii Cape Brink."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Cape Brink", player) > 0
-    #     return has_location
-    return two_island(world, state, player)
+    return reached_map_node(world, state, player, "Cape Brink")
 
+@state_memoized
 def three_island(world: World, state: CollectionState, player: int):
     """Checks if the player can access Sevii Three Island."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Three Island", player) > 0
-    #     return has_location
-    return bills_errand2(world, state, player)
+    return reached_map_node(world, state, player, "Three Island")
 
+@state_memoized
 def bond_bridge(world: World, state: CollectionState, player: int):
     """Checks if the player can access Bond Bridge on Sevii Three Island."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Bond Bridge", player) > 0
-    #     return has_location
-    return three_island(world, state, player) and attack_needed(world, state, player, 443328)
+    return reached_map_node(world, state, player, "Bond Bridge")
 
+@state_memoized
 def berry_forest(world: World, state: CollectionState, player: int, complete_dungeon: bool = True, special_boss_attack: int = 0):
     """Checks if the player can access Berry Forest on Sevii Three Island."""
-    has_dungeon_ticket = state.count("Dungeon Ticket", player) > 0
-    minion_attack = 18120
-    return bond_bridge(world, state, player) and has_dungeon_ticket and dungeon_attack_needed(world, state, player, minion_attack, special_boss_attack, complete_dungeon)
+    return entered_map_node(world, state, player, "Berry Forest") and can_run_dungeon(world, state, player, "Berry Forest", complete_dungeon, special_boss_attack)
 
+@state_memoized
 def professor_ivys_lab(world: World, state: CollectionState, player: int):
     """Checks if the player can access Professor Ivy's Lab."""
-    # if world.options.mapsanity.value > 0:
-    #     has_location = state.count("Professor Ivy's Lab", player) > 0
-    #     return has_location
-    return True
-    
+    return reached_map_node(world, state, player, "Professor Ivy's Lab")
 
 # Eggs and Stones
+@state_memoized
 def can_get_grass_egg(world: World, state: CollectionState, player: int):
     """Checks if the player can obtain a Grass Egg."""
     tutorial_complete = state.count("Tutorial Complete", player) > 0
     has_hatchery = state.count("Mystery Egg", player) > 0
-    return (lavender_town(world, state, player) or can_get_mystery_egg(world, state, player)) and tutorial_complete and has_hatchery
+    return tutorial_complete and has_hatchery and (lavender_town(world, state, player) or can_get_mystery_egg(world, state, player))
 
+@state_memoized
 def can_get_fire_egg(world: World, state: CollectionState, player: int) -> bool:
     """Checks if the player can obtain a Fire Egg."""
     tutorial_complete = state.count("Tutorial Complete", player) > 0
     has_hatchery = state.count("Mystery Egg", player) > 0
-    return (cinnabar_island(world, state, player) or can_get_mystery_egg(world, state, player)) and tutorial_complete and has_hatchery
+    return tutorial_complete and has_hatchery and (cinnabar_island(world, state, player) or can_get_mystery_egg(world, state, player))
 
+@state_memoized
 def can_get_water_egg(world: World, state: CollectionState, player: int) -> bool:
     """Checks if the player can obtain a Water Egg."""
     tutorial_complete = state.count("Tutorial Complete", player) > 0
     has_hatchery = state.count("Mystery Egg", player) > 0
-    return (cerulean_city(world, state, player) or can_get_mystery_egg(world, state, player)) and tutorial_complete and has_hatchery
+    return tutorial_complete and has_hatchery and (cerulean_city(world, state, player) or can_get_mystery_egg(world, state, player))
 
+@state_memoized
 def can_get_electric_egg(world: World, state: CollectionState, player: int) -> bool:
     """Checks if the player can obtain an Electric Egg."""
     tutorial_complete = state.count("Tutorial Complete", player) > 0
     has_hatchery = state.count("Mystery Egg", player) > 0
-    return (vermilion_city(world, state, player) or can_get_mystery_egg(world, state, player)) and tutorial_complete and has_hatchery
+    return tutorial_complete and has_hatchery and (vermilion_city(world, state, player) or can_get_mystery_egg(world, state, player))
 
+@state_memoized
 def can_get_fighting_egg(world: World, state: CollectionState, player: int) -> bool:
     """Checks if the player can obtain a Fighting Egg."""
     tutorial_complete = state.count("Tutorial Complete", player) > 0
     has_hatchery = state.count("Mystery Egg", player) > 0
-    return (saffron_city(world, state, player) or can_get_mystery_egg(world, state, player)) and tutorial_complete and has_hatchery
+    return tutorial_complete and has_hatchery and (saffron_city(world, state, player) or can_get_mystery_egg(world, state, player))
 
+@state_memoized
 def can_get_dragon_egg(world: World, state: CollectionState, player: int) -> bool:
     """Checks if the player can obtain a Dragon Egg."""
     tutorial_complete = state.count("Tutorial Complete", player) > 0
     has_hatchery = state.count("Mystery Egg", player) > 0
-    return (fuchsia_city(world, state, player) or can_get_mystery_egg(world, state, player)) and tutorial_complete and has_hatchery
+    return tutorial_complete and has_hatchery and (fuchsia_city(world, state, player) or can_get_mystery_egg(world, state, player))
 
+@state_memoized
 def can_get_mystery_egg(world: World, state: CollectionState, player: int) -> bool:
     """Checks if the player can obtain a Mystery Egg."""
     tutorial_complete = state.count("Tutorial Complete", player) > 0
     has_hatchery = state.count("Mystery Egg", player) > 0
     enabled = world.options.mystery_egg_in_logic.value
-    return enabled and pewter_city(world, state, player) and tutorial_complete and has_hatchery
+    return enabled and tutorial_complete and has_hatchery and pewter_city(world, state, player)
 
+@state_memoized
 def can_get_moon_stone(world: World, state: CollectionState, player: int) -> bool:
     """Checks if the player can obtain a Moon Stone."""
     tutorial_complete = state.count("Tutorial Complete", player) > 0
-    return saffron_city(world, state, player) and tutorial_complete
+    return tutorial_complete and saffron_city(world, state, player)
 
+@state_memoized
 def can_get_leaf_stone(world: World, state: CollectionState, player: int) -> bool:
     """Checks if the player can obtain a Leaf Stone."""
     tutorial_complete = state.count("Tutorial Complete", player) > 0
-    return saffron_city(world, state, player) and tutorial_complete
+    return tutorial_complete and saffron_city(world, state, player)
 
+@state_memoized
 def can_get_fire_stone(world: World, state: CollectionState, player: int) -> bool:
     """Checks if the player can obtain a Fire Stone."""
     tutorial_complete = state.count("Tutorial Complete", player) > 0
-    return cinnabar_island(world, state, player) and tutorial_complete
+    return tutorial_complete and cinnabar_island(world, state, player)
 
+@state_memoized
 def can_get_water_stone(world: World, state: CollectionState, player: int) -> bool:
     """Checks if the player can obtain a Water Stone."""
     tutorial_complete = state.count("Tutorial Complete", player) > 0
-    return cerulean_city(world, state, player) and tutorial_complete
+    return tutorial_complete and cerulean_city(world, state, player)
 
+@state_memoized
 def can_get_thunder_stone(world: World, state: CollectionState, player: int) -> bool:
     """Checks if the player can obtain a Thunder Stone."""
     tutorial_complete = state.count("Tutorial Complete", player) > 0
-    return vermilion_city(world, state, player) and tutorial_complete
+    return tutorial_complete and vermilion_city(world, state, player)
 
+@state_memoized
 def can_get_linking_cord(world: World, state: CollectionState, player: int) -> bool:
     """Checks if the player can obtain a Linking Cord."""
     tutorial_complete = state.count("Tutorial Complete", player) > 0
-    return fuchsia_city(world, state, player) and tutorial_complete
+    return tutorial_complete and fuchsia_city(world, state, player)
 
 
 # Questlines
+ODDISH_NODES = kanto_map.any_of(["Kanto Route 24", "Kanto Route 25", "Kanto Route 5", "Kanto Route 6", "Kanto Route 8", "Kanto Route 7", "Kanto Route 12",
+                                 "Kanto Route 13", "Kanto Route 14", "Kanto Route 15", "Cape Brink", "Bond Bridge"])
+STARYU_NODES = kanto_map.any_of(["Kanto Route 20", "Kanto Route 21"])
+GROWLITHE_NODES = kanto_map.any_of(["Kanto Route 8", "Kanto Route 7"])
+
+@state_memoized
 def bills_grandpas_treasure_hunt1(world: World, state: CollectionState, player: int):
     """Checks if the first step of Bill's Grandpa's Treasure Hunt questline can be completed."""
     return pallet_town(world, state, player) and bills_house(world, state, player)
 
+@state_memoized
 def can_catch_jigglypuff(world: World, state: CollectionState, player: int):
     """Checks if the player can catch Jigglypuff."""
     return kanto_route_3(world, state, player)
 
+@state_memoized
 def bills_grandpas_treasure_hunt2(world: World, state: CollectionState, player: int):
     """Checks if the second step of Bill's Grandpa's Treasure Hunt questline can be completed."""
     return bills_grandpas_treasure_hunt1(world, state, player) and can_catch_jigglypuff(world, state, player)
 
+@state_memoized
 def can_catch_oddish(world: World, state: CollectionState, player: int):
     """Checks if the player can catch Oddish."""
-    return kanto_route_24(world, state, player) or kanto_route_25(world, state, player) or kanto_route_5(world, state, player) or kanto_route_6(world, state, player) or kanto_route_8(world, state, player) or kanto_route_7(world, state, player) or kanto_route_12(world, state, player) or kanto_route_13(world, state, player) or kanto_route_14(world, state, player) or kanto_route_15(world, state, player) or cape_brink(world, state, player) or bond_bridge(world, state, player) or berry_forest(world, state, player, False) # Oddish
+    return reached_any_map_node(world, state, player, ODDISH_NODES) or berry_forest(world, state, player, False) # Oddish
 
+@state_memoized
 def bills_grandpas_treasure_hunt3(world: World, state: CollectionState, player: int):
     """Checks if the second step of Bill's Grandpa's Treasure Hunt questline can be completed."""
     return bills_grandpas_treasure_hunt2(world, state, player) and can_catch_oddish(world, state, player)
 
+@state_memoized
 def can_catch_staryu(world: World, state: CollectionState, player: int):
     """Checks if the player can catch Staryu."""
-    return kanto_route_20(world, state, player) or kanto_route_21(world, state, player)
+    return reached_any_map_node(world, state, player, STARYU_NODES)
 
+@state_memoized
 def bills_grandpas_treasure_hunt4(world: World, state: CollectionState, player: int):
     """Checks if the second step of Bill's Grandpa's Treasure Hunt questline can be completed."""
     return bills_grandpas_treasure_hunt3(world, state, player) and can_catch_staryu(world, state, player)
 
+@state_memoized
 def can_catch_growlithe(world: World, state: CollectionState, player: int):
     """Checks if the player can catch Growlithe."""
-    return kanto_route_8(world, state, player) or kanto_route_7(world, state, player) or pokemon_mansion(world, state, player, False)
+    return reached_any_map_node(world, state, player, GROWLITHE_NODES) or pokemon_mansion(world, state, player, False)
 
+@state_memoized
 def bills_grandpas_treasure_hunt5(world: World, state: CollectionState, player: int):
     """Checks if the second step of Bill's Grandpa's Treasure Hunt questline can be completed."""
     return bills_grandpas_treasure_hunt4(world, state, player) and can_catch_growlithe(world, state, player)
 
+@state_memoized
 def can_catch_pikachu(world: World, state: CollectionState, player: int):
     """Checks if the player can catch Pikachu."""
     return viridian_forest(world, state, player, True) or power_plant(world, state, player, False)
 
+@state_memoized
 def bills_grandpas_treasure_hunt6(world: World, state: CollectionState, player: int):
     """Checks if the second step of Bill's Grandpa's Treasure Hunt questline can be completed."""
     return bills_grandpas_treasure_hunt5(world, state, player) and can_catch_pikachu(world, state, player)
 
+@state_memoized
 def completed_bills_grandpas_treasure_hunt(world: World, state: CollectionState, player: int):
     """Checks if the player has completed Bill's Grandpa's Treasure Hunt questline."""
     return bills_grandpas_treasure_hunt6(world, state, player) and attack_needed(world, state, player, 525000)
 
+@state_memoized
 def started_bills_errand(world: World, state: CollectionState, player: int):
     """Checks if the player has started Bill's Errand questline."""
-    return cinnabar_island(world, state, player) and pokemon_mansion(world, state, player) and attack_needed(world, state, player, 175290) # Beat Blaine
+    return reached_map_node(world, state, player, "Bill's Errand Started")
 
+@state_memoized
 def bills_errand1(world: World, state: CollectionState, player: int):
     """Checks if the first step of Bill's Errand questline can be completed."""
-    return started_bills_errand(world, state, player) and one_island(world, state, player)
+    return reached_map_node(world, state, player, "Bill's Errand 1")
 
+@state_memoized
 def bills_errand2(world: World, state: CollectionState, player: int):
     """Checks if the second step of Bill's Errand questline can be completed."""
-    return bills_errand1(world, state, player) and two_island(world, state, player)
+    return reached_map_node(world, state, player, "Bill's Errand 2")
 
+@state_memoized
 def bills_errand3(world: World, state: CollectionState, player: int):
     """Checks if the third step of Bill's Errand questline can be completed."""
-    return bills_errand2(world, state, player) and three_island(world, state, player) and attack_needed(world, state, player, 396954)
+    return reached_map_node(world, state, player, "Bill's Errand 3")
 
+@state_memoized
 def bills_errand4(world: World, state: CollectionState, player: int):
     """Checks if the fourth step of Bill's Errand questline can be completed."""
-    return bills_errand3(world, state, player) and three_island(world, state, player) and attack_needed(world, state, player, 443328)
+    return reached_map_node(world, state, player, "Bill's Errand 4")
 
+@state_memoized
 def completed_bills_errand(world: World, state: CollectionState, player: int):
     """Checks if the fifth step of Bill's Errand questline can be completed."""
-    return bills_errand4(world, state, player) and berry_forest(world, state, player)
+    return reached_map_node(world, state, player, "Bill's Errand Completed")
 
+@state_memoized
 def unfinished_business1(world: World, state: CollectionState, player: int):
     """Checks if the player has started the Unfinished Business questline."""
     return pallet_town(world, state, player) and completed_bills_errand(world, state, player)
 
 
 # Special Conditions
+@state_memoized
 def any_kanto_route(world: World, state: CollectionState, player: int):
     """Checks if the player can access any Kanto route."""
-    return (kanto_route_1(world, state, player) or kanto_route_2(world, state, player) or kanto_route_3(world, state, player) or
-            kanto_route_4(world, state, player) or kanto_route_5(world, state, player) or kanto_route_6(world, state, player) or
-            kanto_route_7(world, state, player) or kanto_route_8(world, state, player) or kanto_route_9(world, state, player) or
-            kanto_route_10(world, state, player) or kanto_route_11(world, state, player) or kanto_route_12(world, state, player) or
-            kanto_route_13(world, state, player) or kanto_route_14(world, state, player) or kanto_route_15(world, state, player) or
-            kanto_route_16(world, state, player) or kanto_route_17(world, state, player) or kanto_route_18(world, state, player) or
-            kanto_route_19(world, state, player) or kanto_route_20(world, state, player) or kanto_route_21(world, state, player) or
-            kanto_route_22(world, state, player) or kanto_route_23(world, state, player) or kanto_route_24(world, state, player) or
-            kanto_route_25(world, state, player))
+    return reached_any_map_node(world, state, player, KANTO_ROUTES)
 
+@state_memoized
 def can_catch_x_pokemon(world: World, state: CollectionState, player: int, x: int):
     """Checks if the player can obtain at least X pokemon."""
-    return state.count_group("Pokemon", player) >= int(x)
+    return count_category(state, "Pokemon", player) >= int(x)
 
-def get_party_attack(world: World, state: CollectionState, player: int, num_pokemon: int) -> set:
-    """Returns the attack value of the player's expected current party."""
-    num_badges = 0
-    badge_list = ["Boulder Badge", "Cascade Badge", "Thunder Badge", "Rainbow Badge", "Soul Badge", "Marsh Badge", "Volcano Badge", "Earth Badge", "Kanto Elite Lorelei Badge", "Kanto Elite Bruno Badge", "Kanto Elite Agatha Badge", "Kanto Elite Lance Badge", "Kanto Elite Champion Badge"]
-    for badge in badge_list:
-        num_badges += state.count(badge, player)
+# The attack model only reads counters, which are kept up to date by after_collect_item/after_remove_item in hooks/World.py
+ATTACK_BADGES = frozenset(["Boulder Badge", "Cascade Badge", "Thunder Badge", "Rainbow Badge", "Soul Badge", "Marsh Badge", "Volcano Badge", "Earth Badge", "Kanto Elite Lorelei Badge", "Kanto Elite Bruno Badge", "Kanto Elite Agatha Badge", "Kanto Elite Lance Badge", "Kanto Elite Champion Badge"])
+ATTACK_BADGES_COUNT_KEY = format_state_prog_items_key("Attack", "Badges")
 
-    avgBaseAttack = 70 + 4.2 * num_badges
-    avgLevel = min(100, 20 + 10 * num_badges)
-    return num_pokemon * avgBaseAttack * (avgLevel / 100)
+def get_party_attack(world: World, state: CollectionState, player: int, num_pokemon: int) -> float:
+    """Returns the attack value of the player's expected current party."""
+    return party_attack(num_pokemon, state.count(ATTACK_BADGES_COUNT_KEY, player))
 
-def get_click_attack(world: World, state: CollectionState, player: int, num_pokemon: int) -> set:
+def get_click_attack(world: World, state: CollectionState, player: int, num_pokemon: int) -> float:
     """Returns the attack value of the player's expected clicker attack."""
-    has_shiny_code = state.count("Shiny-Charmer Code", player) > 0
-    has_rocky_helmet = state.count("Rocky Helmet", player) > 0
-    if has_shiny_code:
-        num_pokemon += 1
-    attack = (1 + num_pokemon) ** 1.4
-    if has_rocky_helmet:
-        attack *= 1.4
-    return attack
-    
-def attack_needed(world: World, state: CollectionState, player: int, attack: int):
-    """Checks if the player's expected current party attack is at least X."""
-    num_pokemon = state.count_group("Pokemon", player) #len(get_catchable_pokemon(world, state, player))
+    return click_attack(num_pokemon, state.count("Shiny-Charmer Code", player) > 0, state.count("Rocky Helmet", player) > 0)
+
+@depends_on(items=ATTACK_BADGES | {"Enhanced Auto Clicker", "Enhanced Auto Clicker (Progressive Clicks/Second)", "Shiny-Charmer Code", "Rocky Helmet"},
+            categories=["Pokemon"])
+def get_attack_counts(world: World, state: CollectionState, player: int) -> dict:
+    """Returns the counts the attack model reads from the state, as expected_attacks_for_counts takes them."""
     auto_clicker_count = state.count("Enhanced Auto Clicker", player)
     if world.options.use_scripts.value and not world.options.include_scripts_as_items.value:
         auto_clicker_count = 1
-    progressive_auto_clicker_count = state.count("Enhanced Auto Clicker (Progressive Clicks/Second)", player)
-    if progressive_auto_clicker_count > 0:
-        auto_clicker_count = 0
-    clicks_per_second = max(world.options.clicks_per_second.value, auto_clicker_count * 100, progressive_auto_clicker_count * 20)
-    attack_from_clicks = get_click_attack(world, state, player, num_pokemon) * clicks_per_second
-    return (get_party_attack(world, state, player, num_pokemon) + attack_from_clicks) * 25 >= int(attack)
+    return {
+        "pokemon": count_category(state, "Pokemon", player),
+        "badges": state.count(ATTACK_BADGES_COUNT_KEY, player),
+        "auto_clickers": auto_clicker_count,
+        "progressive_auto_clickers": state.count("Enhanced Auto Clicker (Progressive Clicks/Second)", player),
+        "shiny_code": state.count("Shiny-Charmer Code", player) > 0,
+        "rocky_helmet": state.count("Rocky Helmet", player) > 0,
+    }
+
+@state_memoized
+def get_expected_attack(world: World, state: CollectionState, player: int) -> float:
+    """Returns the attack value of the player's expected current party and clicks."""
+    counts = get_attack_counts(world, state, player)
+    clicks = clicks_per_second(world.options.clicks_per_second.value, counts["auto_clickers"], counts["progressive_auto_clickers"])
+    return expected_attack(counts["pokemon"], counts["badges"], clicks, counts["shiny_code"], counts["rocky_helmet"])
+
+def get_expected_attacks(world: World, states: Iterable[CollectionState], player: int):
+    """Returns the expected attack of the player in every state at once (a numpy array if numpy is installed, a list otherwise)."""
+    return expected_attacks_for_counts(world.options.clicks_per_second.value, (get_attack_counts(world, state, player) for state in states))
+
+@state_memoized
+def attack_needed(world: World, state: CollectionState, player: int, attack: int):
+    """Checks if the player's expected current party attack is at least X."""
+    return get_expected_attack(world, state, player) >= int(attack)
 
+@state_memoized
 def dungeon_attack_needed(world: World, state: CollectionState, player: int, minion_attack: int, special_boss_attack: int, complete_dungeon: bool):
     """Checks if the player's expected current party attack is at least X for dungeons."""
-    dungeon_logic = world.options.dungeon_logic.value
+    attack = get_dungeon_attack(world.options.dungeon_logic.value, minion_attack, special_boss_attack, complete_dungeon)
+    return attack_needed(world, state, player, attack)
+
+# The attack of the minions of every dungeon, the attack needed to run them is precomputed per slot in world.dungeon_attack_table
+DUNGEON_MINION_ATTACK = {
+    "Viridian Forest": 102,
+    "Mt. Moon": 834,
+    "Diglett's Cave": 2962,
+    "Rock Tunnel": 2048,
+    "Rocket Game Corner": 5820,
+    "Pokemon Tower": 7523,
+    "Silph Co.": 10515,
+    "Power Plant": 13507,
+    "Seafoam Islands": 17226,
+    "Pokemon Mansion": 17760,
+    "New Island": 18500,
+    "Mt. Ember": 18120,
+    "Berry Forest": 18120,
+    "Victory Road": 24595,
+    "Cerulean Cave": 28735,
+}
+
+def get_dungeon_attack(dungeon_logic: int, minion_attack: int, special_boss_attack: int, complete_dungeon: bool) -> int:
+    """Returns the attack needed for a dungeon with the given dungeon_logic option value (early, half or all)."""
     boss_attack = 0
     if complete_dungeon:
         boss_attack = special_boss_attack or minion_attack * 5
@@ -724,38 +667,127 @@ def dungeon_attack_needed(world: World, state: CollectionState, player: int, min
     half_attack = minion_attack * 6 + final_pokemon_attack
     full_attack = minion_attack * 13 + boss_attack
 
-    attack = [early_attack, half_attack, full_attack][dungeon_logic]
-    return attack_needed(world, state, player, attack)
+    return [early_attack, half_attack, full_attack][dungeon_logic]
+
+# The dungeon each dungeon function runs, to find the special boss attacks passed to them in the requires
+DUNGEON_FUNCTIONS = {
+    "viridian_forest": "Viridian Forest",
+    "mt_moon": "Mt. Moon",
+    "digletts_cave": "Diglett's Cave",
+    "rock_tunnel": "Rock Tunnel",
+    "rocket_game_corner": "Rocket Game Corner",
+    "pokemon_tower": "Pokemon Tower",
+    "silph_co": "Silph Co.",
+    "power_plant": "Power Plant",
+    "seafoam_islands": "Seafoam Islands",
+    "pokemon_mansion": "Pokemon Mansion",
+    "new_island": "New Island",
+    "mount_ember": "Mt. Ember",
+    "berry_forest": "Berry Forest",
+    "victory_road": "Victory Road",
+    "cerulean_cave": "Cerulean Cave",
+}
+
+@functools.cache
+def get_special_boss_runs() -> frozenset[tuple[str, int]]:
+    """Returns every (dungeon, special_boss_attack) completed by a dungeon function in locations.json, like {new_island(True, 131500)}.
+    The calls are found the same way as in get_breeding_pokemon, the first time they're needed."""
+    runs = set()
+    for location in Data.location_table:
+        if not isinstance(location.get("requires"), str):
+            continue
+        for function in FUNCTION_PATTERN.finditer(location["requires"]):
+            args = [arg.strip() for arg in function.group(2).split(",")]
+            if function.group(1) in DUNGEON_FUNCTIONS and len(args) == 2 and convert_string_to_type(args[0], bool):
+                runs.add((DUNGEON_FUNCTIONS[function.group(1)], convert_string_to_type(args[1], int)))
+    return frozenset(runs)
+
+def build_dungeon_attack_table(world: World) -> dict[tuple[str, bool, int], int]:
+    """Returns the attack needed for every dungeon of the slot, keyed by (dungeon, complete_dungeon, special_boss_attack),
+    including the special boss attacks of get_special_boss_runs()."""
+    dungeon_logic = world.options.dungeon_logic.value
+    table = {(dungeon, complete_dungeon, 0): get_dungeon_attack(dungeon_logic, minion_attack, 0, complete_dungeon)
+             for dungeon, minion_attack in DUNGEON_MINION_ATTACK.items() for complete_dungeon in (True, False)}
+    for dungeon, special_boss_attack in get_special_boss_runs():
+        table[(dungeon, True, special_boss_attack)] = get_dungeon_attack(dungeon_logic, DUNGEON_MINION_ATTACK[dungeon], special_boss_attack, True)
+    return table
+
+def get_dungeon_attack_needed(world: World, dungeon: str, complete_dungeon: bool = True, special_boss_attack: int = 0) -> int:
+    """Returns the attack needed to run the dungeon from the slot's dungeon attack table,
+    a call not found in the requires (from another hook) is computed without being added to it."""
+    key = (dungeon, bool(complete_dungeon), int(special_boss_attack) if complete_dungeon else 0)
+    attack = world.dungeon_attack_table.get(key)
+    if attack is None:
+        attack = get_dungeon_attack(world.options.dungeon_logic.value, DUNGEON_MINION_ATTACK[dungeon], key[2], key[1])
+    return attack
 
+def can_run_dungeon(world: World, state: CollectionState, player: int, dungeon: str, complete_dungeon: bool = True, special_boss_attack: int = 0):
+    """Checks if the player's expected current party attack is enough for the dungeon."""
+    return get_expected_attack(world, state, player) >= get_dungeon_attack_needed(world, dungeon, complete_dungeon, special_boss_attack)
+
+@state_independent
 def dexsanity_enabled(world: World, state: CollectionState, player: int):
     """Checks if Dexsanity is enabled."""
     return world.options.dexsanity.value > 0
 
+@state_independent
 def dexsanity_disabled(world: World, state: CollectionState, player: int):
     """Checks if Dexsanity is disabled."""
     return world.options.dexsanity.value == 0
 
+@state_memoized
+def can_hatch_eggs(world: World, state: CollectionState, player: int):
+    """Checks if the player can hatch pokemon, which is the same for every pokemon bred."""
+    has_hatchery = state.count("Mystery Egg", player) > 0
+    return has_hatchery and count_category(state, "Badges", player) >= 8
+
+@functools.cache
+def get_breeding_pokemon() -> frozenset[str]:
+    """Returns every pokemon bred by a {can_breed(pokemon)} in locations.json, they are all checked at once by get_breedable_pokemon.
+    The calls are found the same way the requires are compiled (only string requires can call functions), the first time they're needed."""
+    return frozenset(function.group(2).strip() for location in Data.location_table if isinstance(location.get("requires"), str)
+                     for function in FUNCTION_PATTERN.finditer(location["requires"]) if function.group(1) == "can_breed")
+
+@depends_on(items=get_breeding_pokemon, functions=["can_hatch_eggs"])
+@state_memoized
+def get_breedable_pokemon(world: World, state: CollectionState, player: int) -> frozenset[str]:
+    """Returns the pokemon of get_breeding_pokemon() that have been received and can be hatched, so their breeding locations are accessible."""
+    if not can_hatch_eggs(world, state, player):
+        return frozenset()
+    return frozenset(pokemon for pokemon in get_breeding_pokemon() if state.count(pokemon, player))
+
+@state_memoized
 def can_breed(world: World, state: CollectionState, player: int, pokemon: str):
     """Checks if the pokemon has been received and can be hatched."""
-    has_pokemon = state.count(pokemon, player) > 0
-    has_8_badges = state.count_group("Badges", player) >= 8
-    has_hatchery = state.count("Mystery Egg", player) > 0
-    return has_pokemon and has_8_badges and has_hatchery
+    if pokemon in get_breeding_pokemon():
+        return pokemon in get_breedable_pokemon(world, state, player)
+    return can_hatch_eggs(world, state, player) and state.count(pokemon, player) > 0
 
+@state_independent
 def starter(world: World, state: CollectionState, player: int):
     """Checks if the starters are in logic."""
     return world.options.starter_logic.value
 
+@state_independent
 def kanto_starter(world: World, state: CollectionState, player: int):
     """Checks if the Kanto starters are in logic."""
     # To be implemented later
     return starter(world, state, player)
 
+@state_memoized
 def kanto_roamer(world: World, state: CollectionState, player: int):
     """Checks if the Kanto roamers are in logic."""
     has_champion_badge = state.count("Kanto Elite Champion Badge", player) > 0
     return has_champion_badge and fuchsia_city(world, state, player)
 
+def fold_has_script(world: World, state: Optional[CollectionState], player: int, script_name: str):
+    """Returns what a {has_script(script_name)} in a requires is replaced with when the rules are set."""
+    if not world.options.use_scripts.value or not world.options.include_scripts_as_items.value:
+        return True
+    return f"|{script_name}|"
+
+@folded_by(fold_has_script)
+@state_memoized
 def has_script(world: World, state: CollectionState, player: int, script_name: str):
     """Checks if the player needs a specific script."""
     if not world.options.use_scripts.value or not world.options.include_scripts_as_items.value:
@@ -763,6 +795,14 @@ def has_script(world: World, state: CollectionState, player: int, script_name: s
     # script_item = get_items_with_value(world, f"Script: {script_name}")
     return state.count(script_name, player) > 0
 
+def fold_can_wander(world: World, state: Optional[CollectionState], player: int):
+    """Returns what a {can_wander()} in a requires is replaced with when the rules are set."""
+    if not world.options.wanderers_in_logic.value:
+        return False
+    return "|Wailmer Pail|"
+
+@folded_by(fold_can_wander)
+@state_memoized
 def can_wander(world: World, state: CollectionState, player: int):
     """Checks if wanderer pokemon are in logic."""
     if not world.options.wanderers_in_logic.value:
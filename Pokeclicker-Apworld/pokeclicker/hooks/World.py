@@ -11,10 +11,11 @@ from ..Locations import ManualLocation
 #location_name_to_location
 from ..Locations import location_name_to_location
 
-# Raw JSON data from the Manual apworld, respectively:
-#          data/game.json, data/items.json, data/locations.json, data/regions.json
+# Raw JSON data from the Manual apworld, loaded the first time they're used:
+#          Data.game_table, Data.item_table, Data.location_table, Data.region_table
+#          for data/game.json, data/items.json, data/locations.json, data/regions.json
 #
-from ..Data import game_table, item_table, location_table, region_table
+from .. import Data
 
 # These helper methods allow you to determine if an option has been set, or what its value is, for any player in the multiworld
 from ..Helpers import is_option_enabled, get_option_value, format_state_prog_items_key, ProgItemsCat
@@ -24,6 +25,9 @@ import logging
 
 from ..functions import get_filler_item_list
 
+# The counters read by the attack model of the rules, and the per slot table of the attack needed for dungeons
+from .Rules import ATTACK_BADGES, ATTACK_BADGES_COUNT_KEY, build_dungeon_attack_table
+
 ########################################################################################
 ## Order of method calls when the world generates:
 ##    1. create_regions - Creates regions and locations
@@ -105,7 +109,7 @@ def before_create_items_starting(item_pool: list, world: World, multiworld: Mult
     if world.options.use_scripts.value == 1 and world.options.include_scripts_as_items.value == 0:
         # Remove all scripts from the item pool and add them to starting items.
         script_list = []
-        for item in item_table:
+        for item in Data.item_table:
             if item.get("category") and "Scripts" in item["category"]:
                 script_list.append(item["name"])
         scripts_to_remove = [item for item in item_pool if item.name in script_list]
@@ -152,7 +156,8 @@ def after_create_items(item_pool: list, world: World, multiworld: MultiWorld, pl
 
 # Called before rules for accessing regions and locations are created. Not clear why you'd want this, but it's here.
 def before_set_rules(world: World, multiworld: MultiWorld, player: int):
-    pass
+    # The attack needed for each dungeon only depends on the slot's options, so it's computed once here instead of in every check
+    world.dungeon_attack_table = build_dungeon_attack_table(world)
 
 # Called after rules for accessing regions and locations are created, in case you want to see or modify that information.
 def after_set_rules(world: World, multiworld: MultiWorld, player: int):
@@ -297,7 +302,8 @@ def after_collect_item(world: World, state: CollectionState, Changed: bool, item
     # the following let you add to the Potato Item Value count
     # if item.name == "Cooked Potato":
     #     state.prog_items[item.player][format_state_prog_items_key(ProgItemsCat.VALUE, "Potato")] += 1
-    pass
+    if Changed and item.name in ATTACK_BADGES:
+        state.prog_items[item.player][ATTACK_BADGES_COUNT_KEY] += 1
 
 # This method is run every time an item is removed from the state, can be used to modify the value of an item.
 # IMPORTANT! Any changes made in this hook must be first done in after_collect_item
@@ -305,7 +311,8 @@ def after_remove_item(world: World, state: CollectionState, Changed: bool, item:
     # the following let you undo the addition to the Potato Item Value count
     # if item.name == "Cooked Potato":
     #     state.prog_items[item.player][format_state_prog_items_key(ProgItemsCat.VALUE, "Potato")] -= 1
-    pass
+    if Changed and item.name in ATTACK_BADGES:
+        state.prog_items[item.player][ATTACK_BADGES_COUNT_KEY] -= 1
 
 
 # This is called before slot data is set and provides an empty dict ({}), in case you want to modify it before Manual does
@@ -318,7 +325,15 @@ def after_fill_slot_data(slot_data: dict, world: World, multiworld: MultiWorld,
 
 # This is called right at the end, in case you want to write stuff to the spoiler log
 def before_write_spoiler(world: World, multiworld: MultiWorld, spoiler_handle) -> None:
-    pass
+    # Write the attack needed for the dungeons, so the dungeon logic can be checked against the playthrough
+    dungeon_attack_table = getattr(world, "dungeon_attack_table", {})
+    if dungeon_attack_table:
+        spoiler_handle.write(f"\n\nDungeon attack needed ({multiworld.get_player_name(world.player)}, dungeon logic: {world.options.dungeon_logic.current_key}):\n\n")
+        for (dungeon, complete_dungeon, special_boss_attack), attack in sorted(dungeon_attack_table.items(), key=lambda entry: entry[1]):
+            run = "complete" if complete_dungeon else "partial"
+            if special_boss_attack:
+                run += f", special boss {special_boss_attack}"
+            spoiler_handle.write(f"{dungeon} ({run}): {attack}\n")
 
 # This is called when you want to add information to the hint text
 def before_extend_hint_information(hint_data: dict[int, dict[int, str]], world: World, multiworld: MultiWorld, player: int) -> None: